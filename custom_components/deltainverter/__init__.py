@@ -1,21 +1,135 @@
-from homeassistant.components.sensor import PLATFORM_SCHEMA
-from homeassistant.helpers import discovery
-from .const import DOMAIN
+from functools import partial
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.helpers import entity_registry as er
+
+from .const import (
+    DOMAIN,
+    DATA_PLANT,
+    DATA_FLEET,
+    CONF_PORT,
+    CONF_BAUDRATE,
+    CONF_SCHEDULE_PHASE,
+    CONF_RS485_MODE,
+    CONF_ECHO,
+    CONF_FRAME_GAP,
+    CONF_RESPONSE_TIMEOUT,
+    CONF_TRANSPORT,
+    DEFAULT_PORT,
+    DEFAULT_BAUDRATE,
+    DEFAULT_RS485_MODE,
+    DEFAULT_ECHO,
+    DEFAULT_FRAME_GAP,
+    DEFAULT_RESPONSE_TIMEOUT,
+    DEFAULT_TRANSPORT,
+    DEFAULT_SCHEDULE_PHASE,
+    PHASE_STAGGER,
+    PHASE_ALIGN,
+)
+from .backfill import async_register_services
+from .coordinator import DeltaInverterDataUpdateCoordinator
+from .fleet import FleetScheduler
+from .plant import PlantAggregator
+from .profiling import async_register_services as async_register_profiling_services
+from .sensor import sensor_unique_id
 
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = ["sensor", "binary_sensor"]
+
+CONFIG_SCHEMA = vol.Schema({
+    vol.Optional(DOMAIN, default={}): vol.Schema({
+        vol.Optional(CONF_SCHEDULE_PHASE, default=DEFAULT_SCHEDULE_PHASE): vol.In([PHASE_STAGGER, PHASE_ALIGN]),
+    }),
+}, extra=vol.ALLOW_EXTRA)
+
 async def async_setup(hass, config):
     _LOGGER.debug("Setting up Delta Inverter integration")
+    conf = config.get(DOMAIN, {})
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    plant = domain_data[DATA_PLANT] = PlantAggregator(hass)
+    fleet = domain_data[DATA_FLEET] = FleetScheduler(hass, conf.get(CONF_SCHEDULE_PHASE, DEFAULT_SCHEDULE_PHASE))
+    # The plant totals are published once per poll cycle.
+    fleet.async_add_cycle_listener(plant.async_publish)
+    async_register_services(hass)
+    async_register_profiling_services(hass)
     return True
 
 async def async_setup_entry(hass, entry):
     _LOGGER.debug("Setting up entry for Delta Inverter integration")
-    # Ensure that the sensor platform gets the configuration data.
-    await discovery.async_load_platform(hass, 'sensor', DOMAIN, entry.data, entry)
+    domain_data = hass.data[DOMAIN]
+    fleet = domain_data[DATA_FLEET]
+    client = fleet.client_for(
+        entry.data.get(CONF_PORT, DEFAULT_PORT),
+        entry.data.get(CONF_BAUDRATE, DEFAULT_BAUDRATE),
+        transport=entry.data.get(CONF_TRANSPORT, DEFAULT_TRANSPORT),
+        rs485=entry.data.get(CONF_RS485_MODE, DEFAULT_RS485_MODE),
+        echo=entry.data.get(CONF_ECHO, DEFAULT_ECHO),
+        frame_gap=entry.data.get(CONF_FRAME_GAP, DEFAULT_FRAME_GAP),
+        timeout=entry.data.get(CONF_RESPONSE_TIMEOUT, DEFAULT_RESPONSE_TIMEOUT) or None,
+    )
+    coordinator = DeltaInverterDataUpdateCoordinator(hass, entry, client)
+    # The inverter sleeps at night, so a failed first poll must not block setup.
+    await coordinator.async_refresh()
+    fleet.async_add(coordinator)
+
+    domain_data[entry.entry_id] = coordinator
+    plant = domain_data[DATA_PLANT]
+    plant.async_update_member(coordinator)
+    entry.async_on_unload(coordinator.async_add_listener(partial(plant.async_update_member, coordinator)))
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
     return True
 
+async def async_update_options(hass, entry):
+    coordinator = hass.data[DOMAIN].get(entry.entry_id)
+    if coordinator is None:
+        return
+    attributes = coordinator.attributes
+    # The coordinator itself updates the entry data with the inverter
+    # identity; those updates leave the options alone and are ignored here.
+    if not coordinator.async_apply_options():
+        return
+    _LOGGER.debug("Applying options of %s: %s", entry.title, entry.options)
+    hass.data[DOMAIN][DATA_FLEET].async_update(coordinator)
+
+    if coordinator.attributes != attributes:
+        # Recreate the entities on the running coordinator and connection.
+        await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+        registry = er.async_get(hass)
+        for attr in set(attributes) - set(coordinator.attributes):
+            entity_id = registry.async_get_entity_id("sensor", DOMAIN, sensor_unique_id(entry.data.get("name"), attr))
+            if entity_id is not None:
+                registry.async_remove(entity_id)
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
 async def async_unload_entry(hass, entry):
     _LOGGER.debug("Unloading entry for Delta Inverter integration")
-    return True
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await hass.data[DOMAIN][DATA_FLEET].async_remove(coordinator)
+        await coordinator.async_shutdown()
+        plant = hass.data[DOMAIN][DATA_PLANT]
+        plant.async_remove_member(entry.entry_id)
+        if plant.owner == entry.entry_id:
+            plant.owner = None
+            await _async_hand_over_plant(hass)
+    return unload_ok
+
+async def _async_hand_over_plant(hass):
+    """Recreate the plant entities under one of the remaining entries."""
+    remaining = [
+        other for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id in hass.data[DOMAIN] and other.state is ConfigEntryState.LOADED
+    ]
+    if len(remaining) < 2:
+        return
+    _LOGGER.debug("Handing the plant entities over to %s", remaining[0].title)
+    await hass.config_entries.async_unload_platforms(remaining[0], ["sensor"])
+    await hass.config_entries.async_forward_entry_setups(remaining[0], ["sensor"])
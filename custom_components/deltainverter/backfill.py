@@ -0,0 +1,236 @@
+import json
+import logging
+from datetime import datetime
+
+import voluptuous as vol
+
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, ATTRIBUTES, ARCHIVE_DIRECTORY
+from .coordinator import DeltaInverterDataUpdateCoordinator
+from .delta_rs485 import ArchiveReader
+from .sensor import sensor_unique_id
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_IMPORT_STATISTICS = "import_statistics"
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_CAPTURE = "capture"
+ATTR_ATTRIBUTES = "attributes"
+
+STATISTICS_ATTRIBUTES = [attr for attr, meta in ATTRIBUTES.items() if meta.get("state_class")]
+
+SERVICE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Required(ATTR_START): cv.datetime,
+    vol.Optional(ATTR_END): cv.datetime,
+    vol.Optional(ATTR_CAPTURE): cv.string,
+    vol.Optional(ATTR_ATTRIBUTES): vol.All(cv.ensure_list, [vol.In(STATISTICS_ATTRIBUTES)]),
+})
+
+HOUR = 3600
+# The recorder's reset detection for total_increasing sensors.
+RESET_RATIO = 0.9
+
+
+def hourly_measurement(timestamps, values):
+    """Mean, min and max per hour, keyed on the epoch second the hour starts."""
+    hours = {}
+    for ts, value in zip(timestamps, values):
+        if value is None:
+            continue
+        hour = int(ts // HOUR * HOUR)
+        bucket = hours.get(hour)
+        if bucket is None:
+            hours[hour] = [value, value, value, 1]
+        else:
+            bucket[0] += value
+            bucket[1] = min(bucket[1], value)
+            bucket[2] = max(bucket[2], value)
+            bucket[3] += 1
+    return {hour: {"mean": total / count, "min": low, "max": high} for hour, (total, low, high, count) in hours.items()}
+
+
+def hourly_total(timestamps, values, last_state=None, last_sum=0):
+    """Last state and running sum per hour of a total_increasing counter.
+
+    Like the recorder, only a drop by more than RESET_RATIO is a reset (the
+    daily counters at midnight, or a replaced inverter), its new value then
+    counts as the increase; smaller dips are taken as they are.
+    """
+    hours = {}
+    total = last_sum
+    previous = last_state
+    for ts, value in zip(timestamps, values):
+        if value is None:
+            continue
+        if previous is not None:
+            total += value if value < RESET_RATIO * previous else value - previous
+        previous = value
+        hours[int(ts // HOUR * HOUR)] = {"state": value, "sum": total}
+    return hours
+
+
+def read_capture(path, coordinator, start, end, attributes):
+    """Samples of one inverter from a JSON lines capture of the standalone poller."""
+    serial = coordinator.identity["sap_serial_number"] if coordinator.identity else None
+    result = {"ts": [], **{attr: [] for attr in attributes}}
+    with open(path) as capture:
+        for line in capture:
+            try:
+                sample = json.loads(line)
+            except ValueError:
+                continue
+            data = sample.get("data")
+            if not data or not start <= sample.get("time", 0) < end:
+                continue
+            if serial and data.get("sap_serial_number"):
+                if data["sap_serial_number"] != serial:
+                    continue
+            elif (sample.get("port"), sample.get("address")) != (coordinator.port, coordinator.address):
+                continue
+            result["ts"].append(sample["time"])
+            for attr in attributes:
+                result[attr].append(data.get(attr))
+    # Captures from several pollers may be concatenated out of order.
+    order = sorted(range(len(result["ts"])), key=result["ts"].__getitem__)
+    return {key: [values[i] for i in order] for key, values in result.items()}
+
+
+def read_archive(path, coordinator, start, end, attributes):
+    inverter = coordinator.identity["sap_serial_number"] if coordinator.identity else coordinator.entry.entry_id
+    return ArchiveReader(path).read(inverter, start, end, attributes)
+
+
+def _as_utc(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return dt_util.as_utc(value)
+
+
+async def _async_last_statistic(hass, statistic_id, start):
+    """The last hourly statistic starting before the hour ``start``, however long ago it was."""
+    from homeassistant.components.recorder import get_instance
+    from homeassistant.components.recorder.statistics import get_last_statistics, statistics_during_period
+
+    recorder = get_instance(hass)
+    rows = await recorder.async_add_executor_job(get_last_statistics, hass, 1, statistic_id, False, {"state", "sum"})
+    rows = rows.get(statistic_id)
+    if not rows:
+        return None
+    last_start = rows[-1]["start"]
+    if isinstance(last_start, datetime):
+        last_start = last_start.timestamp()
+    if last_start < start.timestamp():
+        return rows[-1]
+    # Filling a gap with statistics after it: look back to the first one.
+    rows = await recorder.async_add_executor_job(
+        statistics_during_period, hass, dt_util.utc_from_timestamp(0), start, {statistic_id}, "hour", None, {"state", "sum"},
+    )
+    rows = rows.get(statistic_id)
+    return rows[-1] if rows else None
+
+
+def _metadata(statistic_id, name, attribute, has_sum):
+    meta = ATTRIBUTES[attribute]
+    metadata = {
+        "has_mean": not has_sum,
+        "has_sum": has_sum,
+        "name": name,
+        "source": "recorder",
+        "statistic_id": statistic_id,
+        "unit_of_measurement": meta["unit_of_measurement"] or None,
+    }
+    try:
+        from homeassistant.components.recorder.models import StatisticMeanType
+    except ImportError:
+        return metadata
+    # Newer recorders describe the mean with a type instead of has_mean.
+    metadata["mean_type"] = StatisticMeanType.ARITHMETIC if not has_sum else StatisticMeanType.NONE
+    return metadata
+
+
+async def _async_import_entry(hass, coordinator, start, end, capture, attributes):
+    from homeassistant.components.recorder.statistics import async_import_statistics
+
+    entity_registry = er.async_get(hass)
+    name = coordinator.entry.data.get("name")
+    if capture:
+        samples = await hass.async_add_executor_job(read_capture, capture, coordinator, start.timestamp(), end.timestamp(), attributes)
+    else:
+        samples = await hass.async_add_executor_job(
+            read_archive, hass.config.path(ARCHIVE_DIRECTORY), coordinator, start.timestamp(), end.timestamp(), attributes,
+        )
+    if not samples["ts"]:
+        _LOGGER.info("No samples of %s between %s and %s", coordinator.entry.title, start, end)
+        return 0
+
+    imported = 0
+    for attribute in attributes:
+        statistic_id = entity_registry.async_get_entity_id("sensor", DOMAIN, sensor_unique_id(name, attribute))
+        if statistic_id is None:
+            continue
+        has_sum = ATTRIBUTES[attribute]["state_class"] == "total_increasing"
+        if has_sum:
+            last = await _async_last_statistic(hass, statistic_id, start)
+            hours = await hass.async_add_executor_job(
+                hourly_total, samples["ts"], samples[attribute],
+                last and last.get("state"), (last and last.get("sum")) or 0,
+            )
+        else:
+            hours = await hass.async_add_executor_job(hourly_measurement, samples["ts"], samples[attribute])
+        if not hours:
+            continue
+        statistics = [
+            {"start": dt_util.utc_from_timestamp(hour), **values}
+            for hour, values in sorted(hours.items())
+        ]
+        async_import_statistics(
+            hass,
+            _metadata(statistic_id, f"{name} {ATTRIBUTES[attribute]['friendly_name']}", attribute, has_sum),
+            statistics,
+        )
+        imported += len(statistics)
+    _LOGGER.info("Imported %s hourly statistics of %s from %s samples", imported, coordinator.entry.title, len(samples["ts"]))
+    return imported
+
+
+@callback
+def async_register_services(hass):
+    async def async_import_statistics_service(call):
+        if "recorder" not in hass.config.components:
+            raise HomeAssistantError("The recorder is required to import statistics")
+        # Whole hours only: a partial first hour would replace its complete
+        # row and take the baseline from the row of the same hour.
+        start = _as_utc(call.data[ATTR_START]).replace(minute=0, second=0, microsecond=0)
+        end = _as_utc(call.data.get(ATTR_END, dt_util.utcnow()))
+        # The recorder compiles the running hour itself; only import completed hours.
+        end = min(end, dt_util.utcnow().replace(minute=0, second=0, microsecond=0))
+        if start >= end:
+            raise HomeAssistantError(f"Nothing to import between {start} and {end}")
+        attributes = call.data.get(ATTR_ATTRIBUTES, STATISTICS_ATTRIBUTES)
+        capture = call.data.get(ATTR_CAPTURE)
+        if capture and not hass.config.is_allowed_path(capture):
+            raise HomeAssistantError(f"Reading {capture} is not allowed, add its directory to allowlist_external_dirs")
+
+        entry_ids = call.data.get(ATTR_ENTRY_ID)
+        coordinators = [
+            coordinator for entry_id, coordinator in hass.data[DOMAIN].items()
+            if isinstance(coordinator, DeltaInverterDataUpdateCoordinator) and (not entry_ids or entry_id in entry_ids)
+        ]
+        if not coordinators:
+            raise HomeAssistantError("No matching Delta inverter is configured")
+        for coordinator in coordinators:
+            try:
+                await _async_import_entry(hass, coordinator, start, end, capture, attributes)
+            except OSError as e:
+                raise HomeAssistantError(f"Could not read samples of {coordinator.entry.title}: {e}") from e
+
+    hass.services.async_register(DOMAIN, SERVICE_IMPORT_STATISTICS, async_import_statistics_service, schema=SERVICE_SCHEMA)
@@ -0,0 +1,64 @@
+import logging
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .delta_rs485 import ALARMS
+
+_LOGGER = logging.getLogger(__name__)
+
+CONF_NAME = "name"
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    _LOGGER.debug("Setting up alarm sensors for entry: %s", entry.data)
+    name = entry.data.get(CONF_NAME)
+    if not name:
+        _LOGGER.error("Configuration is missing CONF_NAME")
+        return
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(DeltaInverterAlarmSensor(name, key, coordinator) for key in ALARMS)
+
+
+class DeltaInverterAlarmSensor(CoordinatorEntity, BinarySensorEntity):
+    def __init__(self, name, key, coordinator):
+        super().__init__(coordinator)
+        _, _, friendly_name, problem = ALARMS[key]
+        self._name = f"{name} {friendly_name}"
+        self._key = key
+        self._problem = problem
+        self.entity_id = f"binary_sensor.{name.lower().replace(' ', '_')}_{key}"
+        self._unique_id = f"{self.entity_id}"
+        self._written = None
+
+    @property
+    def unique_id(self):
+        return self._unique_id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def device_class(self):
+        return "problem" if self._problem else None
+
+    @property
+    def is_on(self):
+        return self.coordinator.alarms.state.get(self._key)
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    @callback
+    def _handle_coordinator_update(self):
+        # Every poll notifies the coordinator listeners, but a status bit
+        # almost never changes; only write when this entity's state did.
+        written = (self.available, self.is_on)
+        if written == self._written:
+            return
+        self._written = written
+        self.async_write_ha_state()
@@ -1,8 +1,41 @@
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_NAME
+from homeassistant.core import callback
 import homeassistant.helpers.config_validation as cv
-from .const import DOMAIN, DEFAULT_UPDATE_INTERVAL
+from .const import (
+    DOMAIN,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_PORT,
+    DEFAULT_BAUDRATE,
+    DEFAULT_ADDRESS,
+    DEFAULT_STALE_TTL,
+    DEFAULT_MAX_FAILURES,
+    DEFAULT_ALARM_DEBOUNCE,
+    DEFAULT_ARCHIVE,
+    DEFAULT_RS485_MODE,
+    DEFAULT_ECHO,
+    DEFAULT_FRAME_GAP,
+    DEFAULT_RESPONSE_TIMEOUT,
+    DEFAULT_TRANSPORT,
+    CONF_PORT,
+    CONF_BAUDRATE,
+    CONF_ADDRESS,
+    CONF_STALE_TTL,
+    CONF_MAX_FAILURES,
+    CONF_ALARM_DEBOUNCE,
+    CONF_ARCHIVE,
+    CONF_RS485_MODE,
+    CONF_ECHO,
+    CONF_FRAME_GAP,
+    CONF_RESPONSE_TIMEOUT,
+    CONF_TRANSPORT,
+    TRANSPORT_INLINE,
+    TRANSPORT_PROCESS,
+    CONF_ATTRIBUTES,
+    DEADBANDS,
+    ATTRIBUTES,
+)
 import logging
 
 _LOGGER = logging.getLogger(__name__)
@@ -11,6 +44,11 @@ class DeltaInverterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_CLOUD_POLL
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return DeltaInverterOptionsFlow()
+
     async def async_step_user(self, user_input=None):
         errors = {}
         if user_input is not None:
@@ -19,9 +57,46 @@ class DeltaInverterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         data_schema = {
             vol.Required('name', default="Delta Inverter Sensor"): str,
-            vol.Optional("update_interval", default=DEFAULT_UPDATE_INTERVAL): int,
+            vol.Optional("update_interval", default=DEFAULT_UPDATE_INTERVAL): vol.All(int, vol.Range(min=1)),
+            vol.Optional(CONF_PORT, default=DEFAULT_PORT): str,
+            vol.Optional(CONF_BAUDRATE, default=DEFAULT_BAUDRATE): vol.In([2400, 4800, 9600, 19200, 38400]),
+            vol.Optional(CONF_ADDRESS, default=DEFAULT_ADDRESS): vol.All(int, vol.Range(min=1, max=254)),
+            vol.Optional(CONF_RS485_MODE, default=DEFAULT_RS485_MODE): bool,
+            vol.Optional(CONF_ECHO, default=DEFAULT_ECHO): bool,
+            vol.Optional(CONF_FRAME_GAP, default=DEFAULT_FRAME_GAP): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(CONF_RESPONSE_TIMEOUT, default=DEFAULT_RESPONSE_TIMEOUT): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(CONF_TRANSPORT, default=DEFAULT_TRANSPORT): vol.In([TRANSPORT_INLINE, TRANSPORT_PROCESS]),
+            vol.Optional(CONF_STALE_TTL, default=DEFAULT_STALE_TTL): vol.All(int, vol.Range(min=0)),
+            vol.Optional(CONF_MAX_FAILURES, default=DEFAULT_MAX_FAILURES): vol.All(int, vol.Range(min=0)),
+            vol.Optional(CONF_ALARM_DEBOUNCE, default=DEFAULT_ALARM_DEBOUNCE): vol.All(int, vol.Range(min=1)),
+            vol.Optional(CONF_ARCHIVE, default=DEFAULT_ARCHIVE): bool,
         }
 
         return self.async_show_form(
             step_id="user", data_schema=vol.Schema(data_schema), errors=errors
         )
+
+
+class DeltaInverterOptionsFlow(config_entries.OptionsFlow):
+    """Settings that are applied to the running inverter without reconnecting."""
+
+    async def async_step_init(self, user_input=None):
+        if user_input is not None:
+            _LOGGER.debug("Options received: %s", user_input)
+            return self.async_create_entry(title="", data=user_input)
+
+        entry = self.config_entry
+        options = entry.options
+        data_schema = {
+            vol.Optional(
+                "update_interval",
+                default=options.get("update_interval", entry.data.get("update_interval", DEFAULT_UPDATE_INTERVAL)),
+            ): vol.All(int, vol.Range(min=1)),
+        }
+        for option in DEADBANDS.values():
+            data_schema[vol.Optional(option, default=options.get(option, 0))] = vol.All(vol.Coerce(float), vol.Range(min=0))
+        data_schema[vol.Optional(CONF_ATTRIBUTES, default=options.get(CONF_ATTRIBUTES, list(ATTRIBUTES)))] = cv.multi_select(
+            {attr: meta["friendly_name"] for attr, meta in ATTRIBUTES.items()}
+        )
+
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(data_schema))
@@ -2,65 +2,127 @@ from homeassistant.const import CONF_NAME
 
 DOMAIN = "deltainverter"
 DEFAULT_UPDATE_INTERVAL = 20
+DEFAULT_PORT = "/dev/ttyUSB0"
+DEFAULT_BAUDRATE = 9600
+DEFAULT_ADDRESS = 1
+DEFAULT_STALE_TTL = 300
+DEFAULT_MAX_FAILURES = 10
+DEFAULT_ALARM_DEBOUNCE = 1
+DEFAULT_ARCHIVE = False
+DEFAULT_RS485_MODE = False
+DEFAULT_ECHO = False
+DEFAULT_FRAME_GAP = 11.5
+# 0 derives the response timeout from the baud rate.
+DEFAULT_RESPONSE_TIMEOUT = 0
+
+CONF_PORT = "port"
+CONF_BAUDRATE = "baudrate"
+CONF_ADDRESS = "address"
+CONF_STALE_TTL = "stale_ttl"
+CONF_MAX_FAILURES = "max_failures"
+CONF_IDENTITY = "identity"
+CONF_ALARM_DEBOUNCE = "alarm_debounce"
+CONF_ARCHIVE = "archive"
+CONF_RS485_MODE = "rs485_mode"
+CONF_ECHO = "echo"
+CONF_FRAME_GAP = "frame_gap"
+CONF_RESPONSE_TIMEOUT = "response_timeout"
+CONF_TRANSPORT = "transport"
+CONF_ATTRIBUTES = "attributes"
+CONF_DEADBAND_POWER = "deadband_power"
+CONF_DEADBAND_VOLTAGE = "deadband_voltage"
+CONF_DEADBAND_CURRENT = "deadband_current"
+CONF_DEADBAND_TEMPERATURE = "deadband_temperature"
+
+# Options flow deadbands per sensor device class. A sensor only writes a new
+# state once its value moved at least this far from the last written one.
+DEADBANDS = {
+    "power": CONF_DEADBAND_POWER,
+    "voltage": CONF_DEADBAND_VOLTAGE,
+    "current": CONF_DEADBAND_CURRENT,
+    "temperature": CONF_DEADBAND_TEMPERATURE,
+}
+
+EVENT_ALARM = "deltainverter_alarm"
+
+DATA_PLANT = "plant"
+DATA_FLEET = "fleet"
+DATA_PROFILE = "profile"
+
+# Daily column files below the Home Assistant config directory, see delta_rs485.archive.
+ARCHIVE_DIRECTORY = "deltainverter_archive"
+
+# Bus I/O in Home Assistant's event loop, or in a supervised child process
+# publishing decoded samples through shared memory.
+TRANSPORT_INLINE = "inline"
+TRANSPORT_PROCESS = "process"
+DEFAULT_TRANSPORT = TRANSPORT_INLINE
+
+CONF_SCHEDULE_PHASE = "schedule_phase"
+PHASE_STAGGER = "stagger"
+PHASE_ALIGN = "align"
+DEFAULT_SCHEDULE_PHASE = PHASE_STAGGER
 
 ATTRIBUTES = {
-    #"sap_part_number": {"friendly_name":"SAP Part Number","unit_of_measurement": "", "device_class": None},
-    #"sap_serial_number": {"friendly_name":"SAP Serial Number","unit_of_measurement": "", "device_class": None},
-    #"sap_date_code": {"friendly_name":"SAP Date Code","unit_of_measurement": "", "device_class": None},
-    #"sap_revision": {"friendly_name":"SAP Revision","unit_of_measurement": "", "device_class": None},
-    #"software_revision_ac_control": {"friendly_name":"Software Revision AC Control","unit_of_measurement": "", "device_class": None},
-    #"software_revision_dc_control": {"friendly_name":"Software Revision DC Control","unit_of_measurement": "", "device_class": None},
-    #"software_revision_display": {"friendly_name":"Software Revision Display","unit_of_measurement": "", "device_class": None},
-    #"software_revision_ens_control": {"friendly_name":"Software Revision ENS Control","unit_of_measurement": "", "device_class": None},
-    "solar_current_at_input_1": {"friendly_name":"Solar Current at Input 1","unit_of_measurement": "A", "device_class": "current"},
-    "solar_voltage_at_input_1": {"friendly_name":"Solar Voltage at Input 1","unit_of_measurement": "V", "device_class": "voltage"},
-    "solar_isolation_resistance_at_input_1": {"friendly_name":"Solar Isolation Resistance at Input 1","unit_of_measurement": "Ω", "device_class": "resistance"},
-    "solar_current_at_input_2": {"friendly_name":"Solar Current at Input 2","unit_of_measurement": "A", "device_class": "current"},
-    "solar_voltage_at_input_2": {"friendly_name":"Solar Voltage at Input 2","unit_of_measurement": "V", "device_class": "voltage"},
-    "solar_isolation_resistance_at_input_2": {"friendly_name":"Solar Isolation Resistance at Input 2","unit_of_measurement": "Ω", "device_class": "resistance"},
-    "ac_current": {"friendly_name":"AC Current","unit_of_measurement": "A", "device_class": "current"},
-    "ac_voltage": {"friendly_name":"AC Voltage","unit_of_measurement": "V", "device_class": "voltage"},
-    "ac_power": {"friendly_name":"AC Power","unit_of_measurement": "W", "device_class": "power"},
-    "ac_frequency": {"friendly_name":"AC Frequency","unit_of_measurement": "Hz", "device_class": "frequency"},
-    "supplied_ac_energy": {"friendly_name":"Supplied AC Energy","unit_of_measurement": "kWh", "device_class": "energy"},
-    "inverter_runtime": {"friendly_name":"Inverter Runtime","unit_of_measurement": "hours", "device_class": "duration"},
-    "calculated_temperature_at_ntc_dc_side": {"friendly_name":"Calculated Temperature at NTC (DC Side)","unit_of_measurement": "°C", "device_class": "temperature"},
-    "solar_input_1_mov_resistance": {"friendly_name":"Solar Input 1 MOV Resistance","unit_of_measurement": "Ω", "device_class": "resistance"},
-    "solar_input_2_mov_resistance": {"friendly_name":"Solar Input 2 MOV Resistance","unit_of_measurement": "Ω", "device_class": "resistance"},
-    "calculated_temperature_at_ntc_ac_side": {"friendly_name":"Calculated Temperature at NTC (AC Side)","unit_of_measurement": "°C", "device_class": "temperature"},
-    "ac_voltage_ac_control": {"friendly_name":"AC Voltage (AC Control)","unit_of_measurement": "V", "device_class": "voltage"},
-    "ac_frequency_ac_control": {"friendly_name":"AC Frequency (AC Control)","unit_of_measurement": "Hz", "device_class": "frequency"},
-    "dc_injection_current_ac_control": {"friendly_name":"DC Injection Current (AC Control)","unit_of_measurement": "A", "device_class": "current"},
-    "ac_voltage_ens_control": {"friendly_name":"AC Voltage (ENS Control)","unit_of_measurement": "V", "device_class": "voltage"},
-    "ac_frequency_ens_control": {"friendly_name":"AC Frequency (ENS Control)","unit_of_measurement": "Hz", "device_class": "frequency"},
-    "dc_injection_current_ens_control": {"friendly_name":"DC Injection Current (ENS Control)","unit_of_measurement": "A", "device_class": "current"},
-    "maximum_solar_1_input_current": {"friendly_name":"Maximum Solar 1 Input Current","unit_of_measurement": "A", "device_class": "current"},
-    "maximum_solar_1_input_voltage": {"friendly_name":"Maximum Solar 1 Input Voltage","unit_of_measurement": "V", "device_class": "voltage"},
-    "maximum_solar_1_input_power": {"friendly_name":"Maximum Solar 1 Input Power","unit_of_measurement": "W", "device_class": "power"},
-    "minimum_isolation_resistance_solar_1": {"friendly_name":"Minimum Isolation Resistance Solar 1","unit_of_measurement": "Ω", "device_class": "resistance"},
-    "maximum_isolation_resistance_solar_1": {"friendly_name":"Maximum Isolation Resistance Solar 1","unit_of_measurement": "Ω", "device_class": "resistance"},
-    "maximum_solar_2_input_current": {"friendly_name":"Maximum Solar 2 Input Current","unit_of_measurement": "A", "device_class": "current"},
-    "maximum_solar_2_input_voltage": {"friendly_name":"Maximum Solar 2 Input Voltage","unit_of_measurement": "V", "device_class": "voltage"},
-    "maximum_solar_2_input_power": {"friendly_name":"Maximum Solar 2 Input Power","unit_of_measurement": "W", "device_class": "power"},
-    "minimum_isolation_resistance_solar_2": {"friendly_name":"Minimum Isolation Resistance Solar 2","unit_of_measurement": "Ω", "device_class": "resistance"},
-    "maximum_isolation_resistance_solar_2": {"friendly_name":"Maximum Isolation Resistance Solar 2","unit_of_measurement": "Ω", "device_class": "resistance"},
-    "maximum_ac_current_of_today": {"friendly_name":"Maximum AC Current of Today","unit_of_measurement": "A", "device_class": "current"},
-    "minimum_ac_voltage_of_today": {"friendly_name":"Minimum AC Voltage of Today","unit_of_measurement": "V", "device_class": "voltage"},
-    "maximum_ac_voltage_of_today": {"friendly_name":"Maximum AC Voltage of Today","unit_of_measurement": "V", "device_class": "voltage"},
-    "maximum_ac_power_of_today": {"friendly_name":"Maximum AC Power of Today","unit_of_measurement": "W", "device_class": "power"},
-    "minimum_ac_frequency_of_today": {"friendly_name":"Minimum AC Frequency of Today","unit_of_measurement": "Hz", "device_class": "frequency"},
-    "maximum_ac_frequency_of_today": {"friendly_name":"Maximum AC Frequency of Today","unit_of_measurement": "Hz", "device_class": "frequency"},
-    "global_alarm_status": {"friendly_name":"Global Alarm Status","unit_of_measurement": "", "device_class": None},
-    "status_dc_input": {"friendly_name":"Status DC Input","unit_of_measurement": "", "device_class": None},
-    "limits_dc_input": {"friendly_name":"Limits DC Input","unit_of_measurement": "", "device_class": None},
-    "status_ac_output": {"friendly_name":"Status AC Output","unit_of_measurement": "", "device_class": None},
-    "limits_ac_output": {"friendly_name":"Limits AC Output","unit_of_measurement": "", "device_class": None},
-    "isolation_warning_status": {"friendly_name":"Isolation Warning Status","unit_of_measurement": "", "device_class": None},
-    "dc_hardware_failure": {"friendly_name":"DC Hardware Failure","unit_of_measurement": "", "device_class": None},
-    "ac_hardware_failure": {"friendly_name":"AC Hardware Failure","unit_of_measurement": "", "device_class": None},
-    "ens_hardware_failure": {"friendly_name":"ENS Hardware Failure","unit_of_measurement": "", "device_class": None},
-    "internal_bulk_failure": {"friendly_name":"Internal Bulk Failure","unit_of_measurement": "", "device_class": None},
-    "internal_communications_failure": {"friendly_name":"Internal Communications Failure","unit_of_measurement": "", "device_class": None},
-    "ac_hardware_disturbance": {"friendly_name":"AC Hardware Disturbance","unit_of_measurement": "", "device_class": None}
+    #"sap_part_number": {"friendly_name":"SAP Part Number","unit_of_measurement": "", "device_class": None, "state_class": None},
+    #"sap_serial_number": {"friendly_name":"SAP Serial Number","unit_of_measurement": "", "device_class": None, "state_class": None},
+    #"sap_date_code": {"friendly_name":"SAP Date Code","unit_of_measurement": "", "device_class": None, "state_class": None},
+    #"sap_revision": {"friendly_name":"SAP Revision","unit_of_measurement": "", "device_class": None, "state_class": None},
+    #"software_revision_ac_control": {"friendly_name":"Software Revision AC Control","unit_of_measurement": "", "device_class": None, "state_class": None},
+    #"software_revision_dc_control": {"friendly_name":"Software Revision DC Control","unit_of_measurement": "", "device_class": None, "state_class": None},
+    #"software_revision_display": {"friendly_name":"Software Revision Display","unit_of_measurement": "", "device_class": None, "state_class": None},
+    #"software_revision_ens_control": {"friendly_name":"Software Revision ENS Control","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "solar_current_at_input_1": {"friendly_name":"Solar Current at Input 1","unit_of_measurement": "A", "device_class": "current", "state_class": "measurement"},
+    "solar_voltage_at_input_1": {"friendly_name":"Solar Voltage at Input 1","unit_of_measurement": "V", "device_class": "voltage", "state_class": "measurement"},
+    "solar_isolation_resistance_at_input_1": {"friendly_name":"Solar Isolation Resistance at Input 1","unit_of_measurement": "Ω", "device_class": "resistance", "state_class": "measurement"},
+    "solar_current_at_input_2": {"friendly_name":"Solar Current at Input 2","unit_of_measurement": "A", "device_class": "current", "state_class": "measurement"},
+    "solar_voltage_at_input_2": {"friendly_name":"Solar Voltage at Input 2","unit_of_measurement": "V", "device_class": "voltage", "state_class": "measurement"},
+    "solar_isolation_resistance_at_input_2": {"friendly_name":"Solar Isolation Resistance at Input 2","unit_of_measurement": "Ω", "device_class": "resistance", "state_class": "measurement"},
+    "ac_current": {"friendly_name":"AC Current","unit_of_measurement": "A", "device_class": "current", "state_class": "measurement"},
+    "ac_voltage": {"friendly_name":"AC Voltage","unit_of_measurement": "V", "device_class": "voltage", "state_class": "measurement"},
+    "ac_power": {"friendly_name":"AC Power","unit_of_measurement": "W", "device_class": "power", "state_class": "measurement"},
+    "ac_frequency": {"friendly_name":"AC Frequency","unit_of_measurement": "Hz", "device_class": "frequency", "state_class": "measurement"},
+    "supplied_ac_energy": {"friendly_name":"Supplied AC Energy","unit_of_measurement": "kWh", "device_class": "energy", "state_class": "total_increasing"},
+    "inverter_runtime": {"friendly_name":"Inverter Runtime","unit_of_measurement": "hours", "device_class": "duration", "state_class": "total_increasing"},
+    "supplied_ac_energy_of_today": {"friendly_name":"Supplied AC Energy of Today","unit_of_measurement": "kWh", "device_class": "energy", "state_class": "total_increasing"},
+    "inverter_runtime_of_today": {"friendly_name":"Inverter Runtime of Today","unit_of_measurement": "min", "device_class": "duration", "state_class": "total_increasing"},
+    "calculated_temperature_at_ntc_dc_side": {"friendly_name":"Calculated Temperature at NTC (DC Side)","unit_of_measurement": "°C", "device_class": "temperature", "state_class": "measurement"},
+    "solar_input_1_mov_resistance": {"friendly_name":"Solar Input 1 MOV Resistance","unit_of_measurement": "Ω", "device_class": "resistance", "state_class": "measurement"},
+    "solar_input_2_mov_resistance": {"friendly_name":"Solar Input 2 MOV Resistance","unit_of_measurement": "Ω", "device_class": "resistance", "state_class": "measurement"},
+    "calculated_temperature_at_ntc_ac_side": {"friendly_name":"Calculated Temperature at NTC (AC Side)","unit_of_measurement": "°C", "device_class": "temperature", "state_class": "measurement"},
+    "ac_voltage_ac_control": {"friendly_name":"AC Voltage (AC Control)","unit_of_measurement": "V", "device_class": "voltage", "state_class": "measurement"},
+    "ac_frequency_ac_control": {"friendly_name":"AC Frequency (AC Control)","unit_of_measurement": "Hz", "device_class": "frequency", "state_class": "measurement"},
+    "dc_injection_current_ac_control": {"friendly_name":"DC Injection Current (AC Control)","unit_of_measurement": "A", "device_class": "current", "state_class": "measurement"},
+    "ac_voltage_ens_control": {"friendly_name":"AC Voltage (ENS Control)","unit_of_measurement": "V", "device_class": "voltage", "state_class": "measurement"},
+    "ac_frequency_ens_control": {"friendly_name":"AC Frequency (ENS Control)","unit_of_measurement": "Hz", "device_class": "frequency", "state_class": "measurement"},
+    "dc_injection_current_ens_control": {"friendly_name":"DC Injection Current (ENS Control)","unit_of_measurement": "A", "device_class": "current", "state_class": "measurement"},
+    "maximum_solar_1_input_current": {"friendly_name":"Maximum Solar 1 Input Current","unit_of_measurement": "A", "device_class": "current", "state_class": "measurement"},
+    "maximum_solar_1_input_voltage": {"friendly_name":"Maximum Solar 1 Input Voltage","unit_of_measurement": "V", "device_class": "voltage", "state_class": "measurement"},
+    "maximum_solar_1_input_power": {"friendly_name":"Maximum Solar 1 Input Power","unit_of_measurement": "W", "device_class": "power", "state_class": "measurement"},
+    "minimum_isolation_resistance_solar_1": {"friendly_name":"Minimum Isolation Resistance Solar 1","unit_of_measurement": "Ω", "device_class": "resistance", "state_class": "measurement"},
+    "maximum_isolation_resistance_solar_1": {"friendly_name":"Maximum Isolation Resistance Solar 1","unit_of_measurement": "Ω", "device_class": "resistance", "state_class": "measurement"},
+    "maximum_solar_2_input_current": {"friendly_name":"Maximum Solar 2 Input Current","unit_of_measurement": "A", "device_class": "current", "state_class": "measurement"},
+    "maximum_solar_2_input_voltage": {"friendly_name":"Maximum Solar 2 Input Voltage","unit_of_measurement": "V", "device_class": "voltage", "state_class": "measurement"},
+    "maximum_solar_2_input_power": {"friendly_name":"Maximum Solar 2 Input Power","unit_of_measurement": "W", "device_class": "power", "state_class": "measurement"},
+    "minimum_isolation_resistance_solar_2": {"friendly_name":"Minimum Isolation Resistance Solar 2","unit_of_measurement": "Ω", "device_class": "resistance", "state_class": "measurement"},
+    "maximum_isolation_resistance_solar_2": {"friendly_name":"Maximum Isolation Resistance Solar 2","unit_of_measurement": "Ω", "device_class": "resistance", "state_class": "measurement"},
+    "maximum_ac_current_of_today": {"friendly_name":"Maximum AC Current of Today","unit_of_measurement": "A", "device_class": "current", "state_class": "measurement"},
+    "minimum_ac_voltage_of_today": {"friendly_name":"Minimum AC Voltage of Today","unit_of_measurement": "V", "device_class": "voltage", "state_class": "measurement"},
+    "maximum_ac_voltage_of_today": {"friendly_name":"Maximum AC Voltage of Today","unit_of_measurement": "V", "device_class": "voltage", "state_class": "measurement"},
+    "maximum_ac_power_of_today": {"friendly_name":"Maximum AC Power of Today","unit_of_measurement": "W", "device_class": "power", "state_class": "measurement"},
+    "minimum_ac_frequency_of_today": {"friendly_name":"Minimum AC Frequency of Today","unit_of_measurement": "Hz", "device_class": "frequency", "state_class": "measurement"},
+    "maximum_ac_frequency_of_today": {"friendly_name":"Maximum AC Frequency of Today","unit_of_measurement": "Hz", "device_class": "frequency", "state_class": "measurement"},
+    "global_alarm_status": {"friendly_name":"Global Alarm Status","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "status_dc_input": {"friendly_name":"Status DC Input","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "limits_dc_input": {"friendly_name":"Limits DC Input","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "status_ac_output": {"friendly_name":"Status AC Output","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "limits_ac_output": {"friendly_name":"Limits AC Output","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "isolation_warning_status": {"friendly_name":"Isolation Warning Status","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "dc_hardware_failure": {"friendly_name":"DC Hardware Failure","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "ac_hardware_failure": {"friendly_name":"AC Hardware Failure","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "ens_hardware_failure": {"friendly_name":"ENS Hardware Failure","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "internal_bulk_failure": {"friendly_name":"Internal Bulk Failure","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "internal_communications_failure": {"friendly_name":"Internal Communications Failure","unit_of_measurement": "", "device_class": None, "state_class": None},
+    "ac_hardware_disturbance": {"friendly_name":"AC Hardware Disturbance","unit_of_measurement": "", "device_class": None, "state_class": None}
 }
 
@@ -0,0 +1,244 @@
+import logging
+import time
+
+from homeassistant.core import callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_PORT,
+    DEFAULT_BAUDRATE,
+    DEFAULT_ADDRESS,
+    DEFAULT_STALE_TTL,
+    DEFAULT_MAX_FAILURES,
+    DEFAULT_ALARM_DEBOUNCE,
+    DEFAULT_ARCHIVE,
+    CONF_PORT,
+    CONF_BAUDRATE,
+    CONF_ADDRESS,
+    CONF_STALE_TTL,
+    CONF_MAX_FAILURES,
+    CONF_IDENTITY,
+    CONF_ALARM_DEBOUNCE,
+    CONF_ARCHIVE,
+    CONF_ATTRIBUTES,
+    DEADBANDS,
+    ATTRIBUTES,
+    EVENT_ALARM,
+    ARCHIVE_DIRECTORY,
+)
+from .delta_rs485 import ALARMS, TRACER, AlarmTracker, ArchiveWriter, BusWorker, parse_data, parse_identity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def format_revision(revision):
+    return f"{revision >> 8}.{revision & 0xFF}"
+
+
+class DeltaInverterDataUpdateCoordinator(DataUpdateCoordinator):
+    def __init__(self, hass, entry, client):
+        config = entry.data
+        self.entry = entry
+        self._data = {}
+        self.port = config.get(CONF_PORT, DEFAULT_PORT)
+        self.baudrate = config.get(CONF_BAUDRATE, DEFAULT_BAUDRATE)
+        self.address = config.get(CONF_ADDRESS, DEFAULT_ADDRESS)
+        self.stale_ttl = config.get(CONF_STALE_TTL, DEFAULT_STALE_TTL)
+        self.max_failures = config.get(CONF_MAX_FAILURES, DEFAULT_MAX_FAILURES)
+        self.poll_interval = None
+        self.deadbands = {}
+        self.attributes = []
+        self.async_apply_options()
+        # Shared by all inverters on the same port, see FleetScheduler.
+        self.client = client
+        self.snapshot_time = None
+        self.consecutive_failures = 0
+        self.last_success = None
+        # Identity from the previous run, so the device is known even when the
+        # inverter sleeps at startup. It is re-read once per run.
+        self.identity = config.get(CONF_IDENTITY)
+        self._identity_checked = False
+        self.alarms = AlarmTracker(config.get(CONF_ALARM_DEBOUNCE, DEFAULT_ALARM_DEBOUNCE))
+        self.archive_enabled = config.get(CONF_ARCHIVE, DEFAULT_ARCHIVE)
+        self.archive = None
+        _LOGGER.debug("Data update coordinator initialized with interval: %s seconds", self.poll_interval)
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="Delta Inverter",
+            update_method=self._async_update_data,
+            # Refreshes are driven by the port worker of the FleetScheduler.
+            update_interval=None,
+            # Listeners are only called when the snapshot actually changed.
+            always_update=False,
+        )
+
+    def async_apply_options(self):
+        """Take over the entry options, returns False when none of them changed."""
+        entry = self.entry
+        poll_interval = entry.options.get("update_interval", entry.data.get("update_interval", DEFAULT_UPDATE_INTERVAL))
+        deadbands = {
+            device_class: entry.options[option]
+            for device_class, option in DEADBANDS.items()
+            if entry.options.get(option)
+        }
+        attributes = [attr for attr in entry.options.get(CONF_ATTRIBUTES, ATTRIBUTES) if attr in ATTRIBUTES]
+        if (poll_interval, deadbands, attributes) == (self.poll_interval, self.deadbands, self.attributes):
+            return False
+        self.poll_interval = poll_interval
+        self.deadbands = deadbands
+        self.attributes = attributes
+        return True
+
+    @property
+    def stale(self):
+        if not self._data:
+            return True
+        if self.max_failures and self.consecutive_failures >= self.max_failures:
+            return True
+        return self.stale_ttl > 0 and time.monotonic() - self.last_success >= self.stale_ttl
+
+    @property
+    def device_info(self):
+        info = {
+            "manufacturer": "Delta",
+            "name": self.entry.title,
+        }
+        if not self.identity:
+            info["identifiers"] = {(DOMAIN, self.entry.entry_id)}
+            return info
+        info.update(self._identity_device_info())
+        info["identifiers"] = {(DOMAIN, self.identity["sap_serial_number"])}
+        return info
+
+    def _identity_device_info(self):
+        identity = self.identity
+        return {
+            "model": identity["sap_part_number"],
+            "serial_number": identity["sap_serial_number"],
+            "hw_version": str(identity["sap_revision"]),
+            "sw_version": "AC {} / DC {} / Display {} / ENS {}".format(
+                format_revision(identity["software_revision_ac_control"]),
+                format_revision(identity["software_revision_dc_control"]),
+                format_revision(identity["software_revision_display"]),
+                format_revision(identity["software_revision_ens_control"]),
+            ),
+        }
+
+    async def _async_update_data(self):
+        _LOGGER.debug("Fetching data from serial line: %s", self.port)
+        try:
+            sample = await self._async_fetch()
+            if sample is None:
+                # The bus worker has not published anything new for this
+                # address yet; the values it published last age meanwhile.
+                if self.stale:
+                    raise UpdateFailed(f"No recent sample from the bus worker on {self.port}")
+                return self._data
+            identity, self._data = sample
+            if not self._identity_checked:
+                self._async_update_identity(identity)
+            _LOGGER.debug("Data parsed successfully: %s", self._data)
+        except Exception as e:
+            self.consecutive_failures += 1
+            if self.stale:
+                self._data = {}
+                raise UpdateFailed(f"Error updating data: {e}") from e
+            # Keep serving the last good snapshot; returning the same object
+            # does not notify the listeners, so no state is rewritten.
+            _LOGGER.debug("Keeping last known values after %s failed poll(s): %s", self.consecutive_failures, e)
+            return self._data
+
+        self.consecutive_failures = 0
+        self.last_success = time.monotonic()
+        for key, active in self.alarms.update(self._data):
+            self._fire_alarm_event(key, active)
+        if self.archive_enabled:
+            await self._async_archive(self._data)
+        return self._data
+
+    async def _async_fetch(self):
+        """Identity and measurements of the latest poll."""
+        if isinstance(self.client, BusWorker):
+            # Already decoded by the child process; reading the shared block never blocks.
+            with TRACER.span("parse"):
+                sample = self.client.read(self.address)
+            if sample is None:
+                if not self.client.alive:
+                    raise UpdateFailed(f"Bus worker on {self.port} is not running")
+                return None
+            self.snapshot_time = dt_util.utc_from_timestamp(sample.timestamp)
+            if sample.error:
+                raise UpdateFailed(f"Bus worker on {self.port}: {sample.error}")
+            return sample.identity, sample.data
+
+        data = await self.client.async_send_query(self.address)
+        if not data:
+            raise UpdateFailed(f"No data received from {self.port}")
+        _LOGGER.debug("Data fetched successfully: %s", data)
+        with TRACER.span("parse"):
+            identity = None if self._identity_checked else parse_identity(data)
+            return identity, parse_data(data, identity=False)
+
+    @callback
+    def async_update_listeners(self):
+        # Entity state writes triggered by this poll.
+        with TRACER.span("dispatch"):
+            super().async_update_listeners()
+
+    async def async_shutdown(self):
+        await super().async_shutdown()
+        if self.archive is not None:
+            await self.hass.async_add_executor_job(self.archive.close)
+            self.archive = None
+
+    async def _async_archive(self, data):
+        if self.archive is None:
+            inverter = self.identity["sap_serial_number"] if self.identity else self.entry.entry_id
+            self.archive = ArchiveWriter(self.hass.config.path(ARCHIVE_DIRECTORY), inverter)
+        timestamp = self.snapshot_time.timestamp() if self.snapshot_time else time.time()
+        try:
+            await self.hass.async_add_executor_job(self.archive.append, timestamp, data)
+        except OSError as e:
+            # The archive is a side channel, a full disk must not make the inverter unavailable.
+            _LOGGER.warning("Could not archive sample of %s: %s", self.entry.title, e)
+
+    def _fire_alarm_event(self, key, active):
+        _, _, name, problem = ALARMS[key]
+        _LOGGER.debug("%s: %s %s", self.entry.title, name, "raised" if active else "cleared")
+        self.hass.bus.async_fire(EVENT_ALARM, {
+            "entry_id": self.entry.entry_id,
+            "name": self.entry.title,
+            "serial_number": self.identity["sap_serial_number"] if self.identity else None,
+            "alarm": key,
+            "alarm_name": name,
+            "problem": problem,
+            "active": active,
+        })
+
+    def _async_update_identity(self, identity):
+        self._identity_checked = True
+        if identity == self.identity:
+            return
+        _LOGGER.debug("Inverter identity for %s: %s", self.entry.title, identity)
+        previous = self.identity
+        self.identity = identity
+        self.hass.config_entries.async_update_entry(self.entry, data={**self.entry.data, CONF_IDENTITY: identity})
+
+        registry = dr.async_get(self.hass)
+        old_identifier = (DOMAIN, previous["sap_serial_number"]) if previous else (DOMAIN, self.entry.entry_id)
+        device = registry.async_get_device(identifiers={old_identifier})
+        if device is not None:
+            registry.async_update_device(
+                device.id,
+                new_identifiers={(DOMAIN, identity["sap_serial_number"])},
+                **self._identity_device_info(),
+            )
+
+    def get_data(self, attribute):
+        return self._data.get(attribute, None)
@@ -0,0 +1,30 @@
+"""Home Assistant independent implementation of the Delta RS485 protocol.
+
+The package only depends on pyserial-asyncio, so it can be copied to any
+host attached to a bus and run as ``python -m delta_rs485``.
+"""
+from .alarms import ALARMS, AlarmTracker
+from .archive import ArchiveReader, ArchiveWriter
+from .client import DEFAULT_BAUDRATE, DEFAULT_FRAME_GAP, DeltaInverterClient
+from .data_parser import parse_data, parse_identity
+from .protocol import ProtocolError, calc_crc, create_query
+from .trace import TRACER, Tracer
+from .worker import BusWorker
+
+__all__ = [
+    "ALARMS",
+    "AlarmTracker",
+    "ArchiveReader",
+    "ArchiveWriter",
+    "BusWorker",
+    "DEFAULT_BAUDRATE",
+    "DEFAULT_FRAME_GAP",
+    "DeltaInverterClient",
+    "ProtocolError",
+    "TRACER",
+    "Tracer",
+    "calc_crc",
+    "create_query",
+    "parse_data",
+    "parse_identity",
+]
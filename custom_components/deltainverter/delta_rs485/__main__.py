@@ -0,0 +1,5 @@
+import sys
+
+from .poller import main
+
+sys.exit(main())
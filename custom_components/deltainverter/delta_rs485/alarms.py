@@ -0,0 +1,131 @@
+# Bit definitions from the "Status description" chapter of the public RS485
+# protocol. Each entry is (bit, key, friendly name, is a problem).
+ALARM_BITS = {
+    "global_alarm_status": [
+        (7, "alarm_dc1_startup_isolation_failure", "DC1 Startup Isolation Failure", True),
+        (5, "alarm_dc1_operate_isolation_failure", "DC1 Operate Isolation Failure", True),
+    ],
+    "status_dc_input": [
+        (7, "dc_status_internal_dc_hardware_failure", "Internal DC Hardware Failure", True),
+        (6, "dc_status_internal_communication_error", "Internal Communication Error", True),
+        (5, "dc_status_internal_bulk_failure", "Internal Bulk Failure", True),
+        (4, "dc_status_solar_power_too_low", "Solar Power Too Low", False),
+        (3, "dc_status_temperature_limited_operation", "Temperature Limited Operation", False),
+        (2, "dc_status_power_limited_operation", "Power Limited Operation", False),
+        (1, "dc_status_mpp_limited_operation", "MPP Limited Operation", False),
+        (0, "dc_status_limits_dc", "DC Limits Active", False),
+    ],
+    "limits_dc_input": [
+        (7, "dc_limit_dc1_too_low", "DC1 Too Low", True),
+        (6, "dc_limit_dc1_critical_undervoltage", "DC1 Critical Undervoltage", True),
+        (5, "dc_limit_dc1_undervoltage", "DC1 Undervoltage", True),
+        (4, "dc_limit_dc1_overvoltage", "DC1 Overvoltage", True),
+    ],
+    "status_ac_output": [
+        (7, "ac_status_internal_ac_hardware_failure", "Internal AC Hardware Failure", True),
+        (6, "ac_status_internal_ens_hardware_failure", "Internal ENS Hardware Failure", True),
+        (5, "ac_status_internal_ac_hardware_disturbance", "Internal AC Hardware Disturbance", True),
+        (3, "ac_status_normal_operation", "Normal Operation", False),
+        (2, "ac_status_sync_to_ac", "Sync to AC", False),
+        (0, "ac_status_limits_ac", "AC Limits Active", False),
+    ],
+    "limits_ac_output": [
+        (7, "ac_limit_critical_undervoltage", "AC Critical Undervoltage", True),
+        (6, "ac_limit_undervoltage", "AC Undervoltage", True),
+        (5, "ac_limit_overvoltage", "AC Overvoltage", True),
+        (4, "ac_limit_critical_overvoltage", "AC Critical Overvoltage", True),
+        (3, "ac_limit_low_frequency", "AC Low Frequency", True),
+        (2, "ac_limit_high_frequency", "AC High Frequency", True),
+        (1, "ac_limit_islanding", "Islanding", True),
+        (0, "ac_limit_dc_injection_current", "DC Injection Current", True),
+    ],
+    "isolation_warning_status": [
+        (6, "isolation_startup_input_isolation", "Startup Input Isolation Warning", True),
+        (5, "isolation_pv_plus_grounded", "PV+ Grounded Warning", True),
+        (4, "isolation_running_input_isolation", "Running Input Isolation Warning", True),
+        (3, "isolation_pv_minus_grounded", "PV- Grounded Warning", True),
+        (1, "isolation_varistor", "Varistor Warning", True),
+    ],
+    "dc_hardware_failure": [
+        (7, "dc_hw_ntc_defect", "DC NTC Defect", True),
+        (6, "dc_hw_ntc_overtemperature", "DC NTC Overtemperature", True),
+        (3, "dc_hw_mov_failure", "MOV Failure", True),
+    ],
+    "ac_hardware_failure": [
+        (7, "ac_hw_ntc_defect", "AC NTC Defect", True),
+        (6, "ac_hw_ntc_overtemperature", "AC NTC Overtemperature", True),
+        (4, "ac_hw_helping_voltage_failure", "Helping Voltage Failure", True),
+        (3, "ac_hw_overcurrent_shutdown", "Overcurrent Shutdown", True),
+        (2, "ac_hw_calibration_data_corrupted", "Calibration Data Corrupted", True),
+        (0, "ac_hw_max_ac_power_shutdown", "Max AC Power Shutdown", True),
+    ],
+    "ens_hardware_failure": [
+        (7, "ens_hw_hardware_error", "ENS Hardware Error", True),
+    ],
+    "internal_bulk_failure": [
+        (7, "bulk_undervoltage", "Bulk Undervoltage", True),
+        (6, "bulk_overvoltage", "Bulk Overvoltage", True),
+    ],
+    "internal_communications_failure": [
+        (7, "comm_ac_to_dc_failure", "AC to DC Communication Failure", True),
+        (6, "comm_ac_to_ens_failure", "AC to ENS Communication Failure", True),
+        (5, "comm_ac_to_display_failure", "AC to Display Communication Failure", True),
+        (3, "comm_ac_to_dc_error", "AC to DC Communication Error", True),
+        (2, "comm_ac_to_ens_error", "AC to ENS Communication Error", True),
+        (1, "comm_ac_to_display_error", "AC to Display Communication Error", True),
+    ],
+    "ac_hardware_disturbance": [
+        (7, "ac_disturbance_rtc_error", "RTC Error", True),
+        (6, "ac_disturbance_ac_relay_error", "AC Relay Error", True),
+    ],
+}
+
+# key -> (status field, bit, friendly name, is a problem)
+ALARMS = {
+    key: (field, bit, name, problem)
+    for field, bits in ALARM_BITS.items()
+    for bit, key, name, problem in bits
+}
+
+
+class AlarmTracker:
+    """Decode the status bytes into named flags and report debounced transitions.
+
+    A changed bit has to be seen in ``debounce`` consecutive samples before it
+    is reported, each bit is counted independently. The first sample only sets
+    the baseline and reports nothing.
+    """
+
+    def __init__(self, debounce=1):
+        self.debounce = max(1, debounce)
+        self.state = {}
+        self._pending = {}
+        self._raw = None
+
+    def update(self, data):
+        raw = tuple(data.get(field) for field in ALARM_BITS)
+        # Status bytes rarely change, skip decoding while nothing is pending.
+        if raw == self._raw and not self._pending:
+            return []
+        self._raw = raw
+
+        transitions = []
+        for value, (field, bits) in zip(raw, ALARM_BITS.items()):
+            if value is None:
+                continue
+            for bit, key, _, _ in bits:
+                active = bool(value >> bit & 1)
+                current = self.state.get(key)
+                if current is None:
+                    self.state[key] = active
+                elif active == current:
+                    self._pending.pop(key, None)
+                else:
+                    count = self._pending.get(key, 0) + 1
+                    if count >= self.debounce:
+                        self._pending.pop(key, None)
+                        self.state[key] = active
+                        transitions.append((key, active))
+                    else:
+                        self._pending[key] = count
+        return transitions
@@ -0,0 +1,286 @@
+import array
+import bisect
+import csv
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from .data_parser import MEASUREMENT_FIELDS, _encode
+
+_LOGGER = logging.getLogger(__name__)
+
+# One directory per inverter and UTC day, holding one file per column:
+#
+#   <root>/<inverter>/<YYYY-MM-DD>/ts.col            float64 epoch seconds
+#   <root>/<inverter>/<YYYY-MM-DD>/<field>.col       raw integer as sent by the inverter
+#
+# Columns are little endian with the width of their MEASUREMENT_FIELDS format,
+# so row n is at offset n * width in every file. The day being written stays
+# uncompressed; earlier days are zlib compressed into <field>.col.z.
+TIMESTAMP = 'ts'
+COLUMNS = {TIMESTAMP: ('d', None)}
+COLUMNS.update({name: (fmt, divisor) for name, fmt, divisor in MEASUREMENT_FIELDS})
+
+RAW_SUFFIX = '.col'
+COMPRESSED_SUFFIX = '.col.z'
+
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def day_of(timestamp):
+    return time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+
+
+def compress_day(path):
+    """Compress every raw column of a finished day, safe to repeat after a crash."""
+    for filename in os.listdir(path):
+        if not filename.endswith(RAW_SUFFIX):
+            continue
+        raw = os.path.join(path, filename)
+        compressed = raw[:-len(RAW_SUFFIX)] + COMPRESSED_SUFFIX
+        with open(raw, 'rb') as source:
+            payload = zlib.compress(source.read(), 6)
+        with open(compressed + '.tmp', 'wb') as target:
+            target.write(payload)
+        os.replace(compressed + '.tmp', compressed)
+        # The raw file only disappears once its compressed copy is complete.
+        os.remove(raw)
+    _LOGGER.debug("Compressed archive day %s", path)
+
+
+class ArchiveWriter:
+    """Appends decoded samples of one inverter to its daily column files.
+
+    Timestamps only go forward: a sample older than the last archived one,
+    for instance from a clock step, is dropped so the days stay sorted.
+
+    Blocking file I/O; call it from an executor. Thread safe.
+    """
+
+    def __init__(self, root, inverter):
+        self.path = os.path.join(root, inverter)
+        self._day = None
+        self._last = None
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def append(self, timestamp, data):
+        row = [
+            (name, struct.pack('<' + fmt, value))
+            for (name, fmt, _), value in zip(MEASUREMENT_FIELDS, _encode(MEASUREMENT_FIELDS, data))
+        ]
+        # Value columns first: a row only counts once its timestamp is written.
+        row.append((TIMESTAMP, struct.pack('<d', timestamp)))
+
+        with self._lock:
+            if self._day is None:
+                self._last = self._last_timestamp()
+            if self._last is not None and timestamp < self._last:
+                _LOGGER.debug("Dropping sample at %s, the archive of %s already reaches %s", timestamp, self.path, self._last)
+                return
+            day = day_of(timestamp)
+            if day != self._day:
+                self._open_day(day)
+            for name, packed in row:
+                handle = self._files[name]
+                handle.write(packed)
+                handle.flush()
+            self._last = timestamp
+
+    def close(self):
+        with self._lock:
+            self._close_files()
+            self._day = None
+            self._last = None
+
+    def _close_files(self):
+        for handle in self._files.values():
+            handle.close()
+        self._files = {}
+
+    def _open_day(self, day):
+        self._close_files()
+        self._day = day
+        os.makedirs(os.path.join(self.path, day), exist_ok=True)
+        self._compress_finished(day)
+        day_path = os.path.join(self.path, day)
+        self._decompress(day_path)
+        rows = self._complete_rows(day_path)
+        for name, (fmt, _) in COLUMNS.items():
+            handle = open(os.path.join(day_path, name + RAW_SUFFIX), 'ab')
+            # Cut rows left half written by an interrupted append.
+            handle.truncate(rows * struct.calcsize('<' + fmt))
+            self._files[name] = handle
+
+    def _compress_finished(self, today):
+        for day in os.listdir(self.path):
+            day_path = os.path.join(self.path, day)
+            if day < today and any(name.endswith(RAW_SUFFIX) for name in os.listdir(day_path)):
+                compress_day(day_path)
+
+    def _last_timestamp(self):
+        try:
+            days = sorted(os.listdir(self.path), reverse=True)
+        except FileNotFoundError:
+            return None
+        for day in days:
+            with _DayColumns(os.path.join(self.path, day)) as columns:
+                timestamps = columns.column(TIMESTAMP)
+                if len(timestamps):
+                    return timestamps[-1]
+        return None
+
+    @staticmethod
+    def _decompress(day_path):
+        """Turn a compressed day back into raw columns before appending to it."""
+        for filename in os.listdir(day_path):
+            if not filename.endswith(COMPRESSED_SUFFIX):
+                continue
+            compressed = os.path.join(day_path, filename)
+            raw = compressed[:-len(COMPRESSED_SUFFIX)] + RAW_SUFFIX
+            if not os.path.exists(raw):
+                with open(compressed, 'rb') as source:
+                    payload = zlib.decompress(source.read())
+                with open(raw + '.tmp', 'wb') as target:
+                    target.write(payload)
+                os.replace(raw + '.tmp', raw)
+            os.remove(compressed)
+
+    @staticmethod
+    def _complete_rows(day_path):
+        rows = None
+        for name, (fmt, _) in COLUMNS.items():
+            try:
+                size = os.path.getsize(os.path.join(day_path, name + RAW_SUFFIX))
+            except FileNotFoundError:
+                size = 0
+            count = size // struct.calcsize('<' + fmt)
+            rows = count if rows is None else min(rows, count)
+        return rows
+
+
+class ArchiveReader:
+    """Range queries over the archive, reading only the requested columns.
+
+    Raw columns of the current day are memory mapped, compressed days are
+    decompressed column by column.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def inverters(self):
+        try:
+            return sorted(os.listdir(self.root))
+        except FileNotFoundError:
+            return []
+
+    def days(self, inverter):
+        try:
+            return sorted(os.listdir(os.path.join(self.root, inverter)))
+        except FileNotFoundError:
+            return []
+
+    def read(self, inverter, start=None, end=None, columns=None):
+        """Return {column: [values]} for samples with start <= ts < end.
+
+        Values are scaled like parse_data returns them. ``columns`` defaults
+        to every field; the timestamps are always included.
+        """
+        columns = [name for name in (columns or COLUMNS) if name != TIMESTAMP]
+        for name in columns:
+            if name not in COLUMNS:
+                raise KeyError(f"Unknown archive column: {name}")
+        result = {TIMESTAMP: [], **{name: [] for name in columns}}
+
+        first = day_of(start) if start is not None else None
+        last = day_of(end) if end is not None else None
+        for day in self.days(inverter):
+            if (first and day < first) or (last and day > last):
+                continue
+            self._read_day(os.path.join(self.root, inverter, day), start, end, columns, result)
+        return result
+
+    def export_csv(self, inverter, stream, start=None, end=None, columns=None):
+        data = self.read(inverter, start, end, columns)
+        writer = csv.writer(stream)
+        writer.writerow(list(data))
+        writer.writerows(zip(*data.values()))
+        return len(data[TIMESTAMP])
+
+    def _read_day(self, path, start, end, columns, result):
+        with _DayColumns(path) as day:
+            timestamps = day.column(TIMESTAMP)
+            rows = min([len(timestamps)] + [day.rows(name) for name in columns])
+            low = bisect.bisect_left(timestamps, start, 0, rows) if start is not None else 0
+            high = bisect.bisect_left(timestamps, end, 0, rows) if end is not None else rows
+            if low >= high:
+                return
+            result[TIMESTAMP].extend(timestamps[low:high].tolist())
+            for name in columns:
+                values = day.column(name)[low:high].tolist()
+                divisor = COLUMNS[name][1]
+                if divisor:
+                    values = [value / divisor for value in values]
+                result[name].extend(values)
+
+
+class _DayColumns:
+    """Column access for one day directory, keeping the mappings until closed."""
+
+    def __init__(self, path):
+        self.path = path
+        self._maps = []
+        self._columns = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        for view in self._columns.values():
+            if isinstance(view, memoryview):
+                view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._columns = {}
+        self._maps = []
+
+    def rows(self, name):
+        return len(self.column(name))
+
+    def column(self, name):
+        if name not in self._columns:
+            self._columns[name] = self._load(name)
+        return self._columns[name]
+
+    def _load(self, name):
+        fmt = COLUMNS[name][0]
+        width = struct.calcsize('<' + fmt)
+        raw = os.path.join(self.path, name + RAW_SUFFIX)
+        if os.path.exists(raw):
+            with open(raw, 'rb') as handle:
+                size = os.fstat(handle.fileno()).st_size // width * width
+                if not size:
+                    return array.array(fmt)
+                mapped = mmap.mmap(handle.fileno(), size, access=mmap.ACCESS_READ)
+            if _LITTLE_ENDIAN and struct.calcsize(fmt) == width:
+                self._maps.append(mapped)
+                return memoryview(mapped).cast(fmt)
+            payload = mapped[:]
+            mapped.close()
+        else:
+            try:
+                with open(os.path.join(self.path, name + COMPRESSED_SUFFIX), 'rb') as handle:
+                    payload = zlib.decompress(handle.read())
+            except FileNotFoundError:
+                return array.array(fmt)
+        values = array.array(fmt)
+        values.frombytes(payload[:len(payload) // width * width])
+        if not _LITTLE_ENDIAN:
+            values.byteswap()
+        return values
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+
+import serial_asyncio
+
+from .data_parser import DATA_LENGTH, HEADER_LENGTH
+from .protocol import (
+    CMD_MEASUREMENTS,
+    STX,
+    SUB_CMD_MEASUREMENTS,
+    ProtocolError,
+    check_response,
+    create_query,
+    crc_matches,
+    frame_length,
+)
+from .trace import TRACER
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BAUDRATE = 9600
+# Time the inverter may take before it starts answering a query.
+DEFAULT_TURNAROUND = 1.0
+# Measurement response: header, identity and measurements, CRC and ETX.
+RESPONSE_LENGTH = HEADER_LENGTH + DATA_LENGTH + 3
+
+# Start bit, 8 data bits and a stop bit.
+BITS_PER_CHAR = 10
+# Bus silence before the next query. The protocol asks for more than 12 ms at
+# 9600 baud, i.e. about 11.5 character times, which scales with the baud rate.
+DEFAULT_FRAME_GAP = 11.5
+
+
+def char_time(baudrate):
+    return BITS_PER_CHAR / baudrate
+
+
+def response_timeout(baudrate, length=RESPONSE_LENGTH, turnaround=DEFAULT_TURNAROUND):
+    """Time to wait for a response of ``length`` bytes at ``baudrate``."""
+    return turnaround + length * char_time(baudrate)
+
+
+class DeltaInverterClient:
+    """Serial connection to one RS485 bus, shared by every inverter address on it.
+
+    ``rs485`` lets the serial driver switch the transceiver direction with RTS,
+    ``echo`` reads back and discards our own query on adapters that receive
+    what they send, and ``frame_gap`` is the bus silence in character times
+    kept between the end of one transaction and the next query. ``timeout``
+    is the response timeout in seconds, by default derived from the baud rate
+    with response_timeout().
+    """
+
+    def __init__(self, port, baudrate=DEFAULT_BAUDRATE, timeout=None, rs485=False, echo=False, frame_gap=DEFAULT_FRAME_GAP):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout or response_timeout(baudrate)
+        self.rs485 = rs485
+        self.echo = echo
+        self.frame_gap = frame_gap * char_time(baudrate)
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+        self._idle_since = 0
+
+    @property
+    def connected(self):
+        return self._writer is not None
+
+    async def async_connect(self):
+        if self._writer is None:
+            _LOGGER.debug("Opening serial port %s at %s baud", self.port, self.baudrate)
+            self._reader, self._writer = await serial_asyncio.open_serial_connection(url=self.port, baudrate=self.baudrate)
+            if self.rs485:
+                self._configure_rs485()
+
+    def _configure_rs485(self):
+        import serial.rs485
+
+        # RTS high while transmitting, released right after the last stop bit
+        # so the first bytes of the answer are not lost.
+        settings = serial.rs485.RS485Settings(rts_level_for_tx=True, rts_level_for_rx=False)
+        try:
+            self._writer.transport.serial.rs485_mode = settings
+        except (AttributeError, OSError, ValueError) as e:
+            _LOGGER.warning("RS485 direction control is not supported on %s, relying on the adapter: %s", self.port, e)
+
+    async def async_close(self):
+        writer = self._writer
+        self._reader = None
+        self._writer = None
+        if writer is not None:
+            _LOGGER.debug("Closing serial port %s", self.port)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception as e:
+                _LOGGER.debug("Error while closing %s: %s", self.port, e)
+
+    async def async_send_query(self, address, command=CMD_MEASUREMENTS, sub_command=SUB_CMD_MEASUREMENTS, data=b''):
+        with TRACER.span('create_query'):
+            query = create_query(address, command, sub_command, data)
+        _LOGGER.debug("Sending query to %s/%s: %s", self.port, address, query)
+
+        # The bus is half-duplex: only one transaction may be in flight.
+        async with self._lock:
+            await self.async_connect()
+            loop = asyncio.get_running_loop()
+            # Keep the inter-frame silence instead of a fixed pause, so many
+            # addresses can be polled back to back.
+            delay = self._idle_since + self.frame_gap - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                with TRACER.span('write'):
+                    self._writer.write(query)
+                    await self._writer.drain()
+                    if self.echo:
+                        await asyncio.wait_for(self._read_echo(query), self.timeout)
+                with TRACER.span('read'):
+                    response = await asyncio.wait_for(self._read_frame(), self.timeout)
+            except Exception as e:
+                _LOGGER.debug("Exception occurred while sending query to %s/%s: %s", self.port, address, e)
+                # Drop the connection so the next query starts from a clean buffer.
+                await self.async_close()
+                raise
+            finally:
+                self._idle_since = loop.time()
+
+        _LOGGER.debug("Complete response: %s", response)
+        check_response(response, address)
+        if not crc_matches(response):
+            # A corrupted frame decodes into plausible but wrong values, e.g. an
+            # energy counter that seems to reset; never hand it on.
+            raise ProtocolError(f"CRC mismatch in response from {self.port}/{address}")
+        return response
+
+    async def _read_echo(self, query):
+        echo = await self._reader.readexactly(len(query))
+        if echo != query:
+            raise ProtocolError(f"Echo does not match the query, bus collision on {self.port}?")
+
+    async def _read_frame(self):
+        # Skip anything before the start of the frame.
+        await self._reader.readuntil(bytes([STX]))
+        header = bytes([STX]) + await self._reader.readexactly(3)
+        body = await self._reader.readexactly(frame_length(header) - len(header))
+        return header + body
@@ -0,0 +1,111 @@
+import struct
+
+HEADER_LENGTH = 6  # Začátek dat za hlavičkou protokolu
+
+# Frame layout after the header: (name, struct format, divisor). Fields
+# without a divisor are returned as the raw integer or stripped string.
+IDENTITY_FIELDS = [
+    ('sap_part_number', '11s', None),
+    ('sap_serial_number', '18s', None),
+    ('sap_date_code', 'I', None),
+    ('sap_revision', 'H', None),
+    ('software_revision_ac_control', 'H', None),
+    ('software_revision_dc_control', 'H', None),
+    ('software_revision_display', 'H', None),
+    ('software_revision_ens_control', 'H', None),
+]
+
+MEASUREMENT_FIELDS = [
+    ('solar_current_at_input_1', 'H', 10),
+    ('solar_voltage_at_input_1', 'H', 10),
+    ('solar_isolation_resistance_at_input_1', 'H', None),
+    ('solar_current_at_input_2', 'H', 10),
+    ('solar_voltage_at_input_2', 'H', 10),
+    ('solar_isolation_resistance_at_input_2', 'H', None),
+    ('ac_current', 'H', 10),
+    ('ac_voltage', 'H', 10),
+    ('ac_power', 'H', None),
+    ('ac_frequency', 'H', 100),
+    # Energy and runtime of the current day; the lifetime counters follow the daily extremes below.
+    ('supplied_ac_energy_of_today', 'I', 1000),
+    ('inverter_runtime_of_today', 'I', None),
+    ('calculated_temperature_at_ntc_dc_side', 'H', 10),
+    ('solar_input_1_mov_resistance', 'H', None),
+    ('solar_input_2_mov_resistance', 'H', None),
+    ('calculated_temperature_at_ntc_ac_side', 'H', 10),
+    ('ac_voltage_ac_control', 'H', 10),
+    ('ac_frequency_ac_control', 'H', 100),
+    ('dc_injection_current_ac_control', 'H', None),
+    ('ac_voltage_ens_control', 'H', 10),
+    ('ac_frequency_ens_control', 'H', 100),
+    ('dc_injection_current_ens_control', 'H', None),
+    ('maximum_solar_1_input_current', 'H', 10),
+    ('maximum_solar_1_input_voltage', 'H', 10),
+    ('maximum_solar_1_input_power', 'H', None),
+    ('minimum_isolation_resistance_solar_1', 'H', None),
+    ('maximum_isolation_resistance_solar_1', 'H', None),
+    ('maximum_solar_2_input_current', 'H', 10),
+    ('maximum_solar_2_input_voltage', 'H', 10),
+    ('maximum_solar_2_input_power', 'H', None),
+    ('minimum_isolation_resistance_solar_2', 'H', None),
+    ('maximum_isolation_resistance_solar_2', 'H', None),
+    ('maximum_ac_current_of_today', 'H', 10),
+    ('minimum_ac_voltage_of_today', 'H', 10),
+    ('maximum_ac_voltage_of_today', 'H', 10),
+    ('maximum_ac_power_of_today', 'H', None),
+    ('minimum_ac_frequency_of_today', 'H', 100),
+    ('maximum_ac_frequency_of_today', 'H', 100),
+    ('supplied_ac_energy', 'I', 1000),
+    ('inverter_runtime', 'I', None),
+    ('global_alarm_status', 'B', None),
+    ('status_dc_input', 'B', None),
+    ('limits_dc_input', 'B', None),
+    ('status_ac_output', 'B', None),
+    ('limits_ac_output', 'B', None),
+    ('isolation_warning_status', 'B', None),
+    ('dc_hardware_failure', 'B', None),
+    ('ac_hardware_failure', 'B', None),
+    ('ens_hardware_failure', 'B', None),
+    ('internal_bulk_failure', 'B', None),
+    ('internal_communications_failure', 'B', None),
+    ('ac_hardware_disturbance', 'B', None),
+]
+
+_IDENTITY = struct.Struct('>' + ''.join(fmt for _, fmt, _ in IDENTITY_FIELDS))
+_MEASUREMENTS = struct.Struct('>' + ''.join(fmt for _, fmt, _ in MEASUREMENT_FIELDS))
+
+IDENTITY_LENGTH = _IDENTITY.size
+DATA_LENGTH = IDENTITY_LENGTH + _MEASUREMENTS.size
+
+
+def _decode(fields, values, results):
+    for (name, _, divisor), value in zip(fields, values):
+        if isinstance(value, bytes):
+            value = value.decode('utf-8').strip()
+        elif divisor:
+            value = value / divisor
+        results[name] = value
+    return results
+
+
+def _encode(fields, values):
+    raw = []
+    for name, fmt, divisor in fields:
+        value = values.get(name, 0)
+        if fmt.endswith('s'):
+            raw.append(str(value or '').encode('utf-8').ljust(int(fmt[:-1])))
+        else:
+            limit = (1 << (8 * struct.calcsize('>' + fmt))) - 1
+            raw.append(min(max(round(value * (divisor or 1)), 0), limit))
+    return raw
+
+
+def parse_identity(data):
+    return _decode(IDENTITY_FIELDS, _IDENTITY.unpack_from(data, HEADER_LENGTH), {})
+
+
+def parse_data(data, identity=True):
+    # The identity block never changes while the inverter runs, callers that
+    # already know it can skip decoding it on every poll.
+    results = parse_identity(data) if identity else {}
+    return _decode(MEASUREMENT_FIELDS, _MEASUREMENTS.unpack_from(data, HEADER_LENGTH + IDENTITY_LENGTH), results)
@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+
+from .client import DEFAULT_BAUDRATE, DEFAULT_FRAME_GAP, DeltaInverterClient
+from .data_parser import parse_data
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 20
+MAX_CLIENT_BACKLOG = 1024 * 1024
+
+
+def parse_bus(spec):
+    """Parse a ``PORT[@ADDRESS[,ADDRESS...]]`` bus specification."""
+    port, _, addresses = spec.partition('@')
+    if not port:
+        raise argparse.ArgumentTypeError(f"Missing port in bus specification '{spec}'")
+    try:
+        addresses = [int(address) for address in addresses.split(',')] if addresses else [1]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid address list in bus specification '{spec}'")
+    for address in addresses:
+        if not 1 <= address <= 254:
+            raise argparse.ArgumentTypeError(f"Address {address} out of range 1-254")
+    return port, addresses
+
+
+def parse_listen(spec):
+    host, _, port = spec.rpartition(':')
+    try:
+        return host or '0.0.0.0', int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid listen address '{spec}'")
+
+
+class SampleStream:
+    """Fan out JSON lines to stdout and to every connected socket client."""
+
+    def __init__(self, stdout=True):
+        self.stdout = stdout
+        self._clients = set()
+        self._server = None
+
+    async def async_listen(self, host, port):
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        _LOGGER.info("Streaming samples on %s:%s", host, port)
+
+    async def _handle_client(self, reader, writer):
+        _LOGGER.info("Client connected: %s", writer.get_extra_info('peername'))
+        self._clients.add(writer)
+
+    def emit(self, sample):
+        line = json.dumps(sample, separators=(',', ':')) + '\n'
+        if self.stdout:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+        payload = line.encode()
+        for writer in list(self._clients):
+            # Drop clients that went away or stopped reading instead of buffering for them.
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_CLIENT_BACKLOG:
+                _LOGGER.info("Dropping client: %s", writer.get_extra_info('peername'))
+                self._clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(payload)
+
+    async def async_close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in self._clients:
+            writer.close()
+        self._clients.clear()
+
+
+async def poll_bus(client, addresses, interval, stream):
+    loop = asyncio.get_running_loop()
+    next_run = loop.time()
+    while True:
+        for address in addresses:
+            sample = {"time": time.time(), "port": client.port, "address": address}
+            try:
+                frame = await client.async_send_query(address)
+                sample["data"] = parse_data(frame)
+            except Exception as e:
+                sample["error"] = str(e) or type(e).__name__
+            stream.emit(sample)
+        next_run += interval
+        await asyncio.sleep(max(0, next_run - loop.time()))
+
+
+async def run(args):
+    stream = SampleStream(stdout=not args.quiet)
+    if args.listen:
+        await stream.async_listen(*args.listen)
+
+    clients = [
+        (DeltaInverterClient(port, args.baudrate, rs485=args.rs485, echo=args.echo, frame_gap=args.frame_gap, timeout=args.timeout), addresses)
+        for port, addresses in args.bus
+    ]
+    try:
+        # Each bus is independent, so they are polled concurrently.
+        await asyncio.gather(*(poll_bus(client, addresses, args.interval, stream) for client, addresses in clients))
+    finally:
+        for client, _ in clients:
+            await client.async_close()
+        await stream.async_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="delta_rs485",
+        description="Poll Delta inverters over RS485 and stream JSON samples.",
+    )
+    parser.add_argument("--bus", type=parse_bus, action="append", required=True,
+                        help="serial port and inverter addresses, e.g. /dev/ttyUSB0@1,2 (repeatable)")
+    parser.add_argument("--baudrate", type=int, default=DEFAULT_BAUDRATE)
+    parser.add_argument("--rs485", action="store_true", help="let the serial driver switch the RS485 direction with RTS")
+    parser.add_argument("--echo", action="store_true", help="the adapter echoes the query, read it back and discard it")
+    parser.add_argument("--frame-gap", type=float, default=DEFAULT_FRAME_GAP, metavar="CHARS",
+                        help="bus silence between transactions in character times")
+    parser.add_argument("--timeout", type=float, metavar="SECONDS",
+                        help="response timeout, derived from the baud rate by default")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between polls of a bus")
+    parser.add_argument("--listen", type=parse_listen, metavar="[HOST:]PORT",
+                        help="also stream samples to TCP clients connecting to this address")
+    parser.add_argument("--quiet", action="store_true", help="do not write samples to stdout")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,60 @@
+import struct
+
+STX = 0x02
+ETX = 0x03
+ENQ = 0x05
+ACK = 0x06
+NAK = 0x15
+
+CMD_MEASUREMENTS = 96
+SUB_CMD_MEASUREMENTS = 1
+
+
+class ProtocolError(Exception):
+    """Raised when the inverter answers with a malformed or rejected frame."""
+
+
+def calc_crc(data):
+    crc = 0x0000
+    for pos in data:
+        crc ^= pos
+        for _ in range(8):
+            if crc & 0x0001:
+                crc >>= 1
+                crc ^= 0xA001
+            else:
+                crc >>= 1
+    return crc
+
+
+def create_query(address, command, sub_command, data=b''):
+    frame = struct.pack('BB', STX, ENQ) + struct.pack('B', address) + struct.pack('B', len(data) + 2) + struct.pack('B', command) + struct.pack('B', sub_command) + data
+
+    crc = calc_crc(frame[1:])
+    crc_low = crc & 0xFF
+    crc_high = (crc >> 8) & 0xFF
+
+    frame += struct.pack('BB', crc_low, crc_high) + struct.pack('B', ETX)
+    return frame
+
+
+def frame_length(header):
+    # STX, ACK/NAK, address, # of data bytes, ..., CRC low, CRC high, ETX
+    return 4 + header[3] + 3
+
+
+def check_response(frame, address):
+    if frame[0] != STX or frame[-1] != ETX:
+        raise ProtocolError(f"Invalid frame delimiters: {frame[:1].hex()}..{frame[-1:].hex()}")
+    if frame[2] != address:
+        raise ProtocolError(f"Response from address {frame[2]}, expected {address}")
+    if frame[1] == NAK:
+        raise ProtocolError(f"Inverter {address} rejected command {frame[4]}/{frame[5]}")
+    if frame[1] != ACK:
+        raise ProtocolError(f"Unexpected response type {frame[1]:#04x}")
+    return frame
+
+
+def crc_matches(frame):
+    crc = calc_crc(frame[1:-3])
+    return frame[-3] == crc & 0xFF and frame[-2] == (crc >> 8) & 0xFF
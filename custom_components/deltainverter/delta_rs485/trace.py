@@ -0,0 +1,72 @@
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+# Durations kept per stage for the percentiles; count and total cover all of them.
+MAX_SAMPLES = 10000
+
+_NOOP = nullcontext()
+
+
+class Tracer:
+    """Per-stage timing spans of the poll path, a no-op unless enabled.
+
+    Stages used in this package: ``create_query``, ``write``, ``read`` and
+    ``parse``; the integration adds ``dispatch``.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._stages = {}
+
+    def span(self, stage):
+        if not self.enabled:
+            return _NOOP
+        return self._span(stage)
+
+    @contextmanager
+    def _span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        entry = self._stages.get(stage)
+        if entry is None:
+            entry = self._stages[stage] = [0, 0.0, deque(maxlen=MAX_SAMPLES)]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2].append(seconds)
+
+    def start(self):
+        self._stages = {}
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+        return self.summary()
+
+    def summary(self):
+        """{stage: {count, total_ms, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}"""
+        result = {}
+        for stage, (count, total, samples) in self._stages.items():
+            ordered = sorted(samples)
+            result[stage] = {
+                'count': count,
+                'total_ms': round(total * 1000, 3),
+                'mean_ms': round(total / count * 1000, 3),
+                'p50_ms': round(_percentile(ordered, 0.5) * 1000, 3),
+                'p95_ms': round(_percentile(ordered, 0.95) * 1000, 3),
+                'p99_ms': round(_percentile(ordered, 0.99) * 1000, 3),
+                'max_ms': round(ordered[-1] * 1000, 3),
+            }
+        return result
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+TRACER = Tracer()
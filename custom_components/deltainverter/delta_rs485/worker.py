@@ -0,0 +1,352 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Connection
+
+from .client import DeltaInverterClient
+from .data_parser import HEADER_LENGTH, IDENTITY_FIELDS, MEASUREMENT_FIELDS, _IDENTITY, _decode, parse_data
+
+_LOGGER = logging.getLogger(__name__)
+
+# One slot per bus address, each guarded by a sequence counter (seqlock): the
+# writer makes it odd before and even again after updating the slot, readers
+# retry when it is odd or changed while they were reading.
+SEQUENCE = struct.Struct('<Q')
+# Timestamp, ok flag, error message, the identity block as in the frame and
+# every measurement decoded to a double, in MEASUREMENT_FIELDS order.
+BODY = struct.Struct(
+    '<d?47s'
+    + ''.join(fmt for _, fmt, _ in IDENTITY_FIELDS)
+    + 'd' * len(MEASUREMENT_FIELDS)
+)
+# Slots start on cache line boundaries, so the sequence counter is aligned.
+SLOT_SIZE = (SEQUENCE.size + BODY.size + 63) // 64 * 64
+SLOTS = 256
+BLOCK_SIZE = SLOT_SIZE * SLOTS
+
+_IDENTITY_COUNT = len(IDENTITY_FIELDS)
+_MEASUREMENT_NAMES = [name for name, _, _ in MEASUREMENT_FIELDS]
+_INTEGER_FIELDS = {name for name, _, divisor in MEASUREMENT_FIELDS if not divisor}
+_READ_RETRIES = 3
+
+RESTART_DELAY = 5
+MAX_RESTART_DELAY = 300
+STOP_TIMEOUT = 5
+
+# The directory holding this package. The child process only gets it on its
+# path, so it imports the protocol core and never the integration around it.
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CHILD_MAIN = 'from delta_rs485.worker import main; main()'
+
+Sample = namedtuple('Sample', ['timestamp', 'error', 'identity', 'data'])
+
+
+class SnapshotBlock:
+    """Latest decoded sample per address in a shared memory block."""
+
+    def __init__(self, shm):
+        self.shm = shm
+        self.buf = shm.buf
+        self._seen = {}
+
+    @classmethod
+    def create(cls):
+        return cls(shared_memory.SharedMemory(create=True, size=BLOCK_SIZE))
+
+    @classmethod
+    def attach(cls, name):
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the block with the
+            # resource tracker of this process, which would start one and
+            # unlink the parent's block when the child exits.
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self, unlink=False):
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+    def write(self, address, timestamp, frame=None, error=None):
+        if frame is not None:
+            identity = _IDENTITY.unpack_from(frame, HEADER_LENGTH)
+            data = parse_data(frame, identity=False)
+            values = [float(data[name]) for name in _MEASUREMENT_NAMES]
+        else:
+            identity = (b'', b'', 0, 0, 0, 0, 0, 0)
+            values = [0.0] * len(_MEASUREMENT_NAMES)
+        error = (error or '').encode('utf-8', 'replace')[:47]
+
+        offset = address * SLOT_SIZE
+        sequence = SEQUENCE.unpack_from(self.buf, offset)[0]
+        SEQUENCE.pack_into(self.buf, offset, sequence + 1)
+        BODY.pack_into(self.buf, offset + SEQUENCE.size, timestamp, frame is not None, error, *identity, *values)
+        SEQUENCE.pack_into(self.buf, offset, sequence + 2)
+
+    def read(self, address):
+        """The sample published since the last read of ``address``, or None.
+
+        Never blocks: a slot that stays torn over a few retries is simply
+        picked up on the next read.
+        """
+        offset = address * SLOT_SIZE
+        for _ in range(_READ_RETRIES):
+            sequence = SEQUENCE.unpack_from(self.buf, offset)[0]
+            if not sequence or sequence == self._seen.get(address):
+                return None
+            if sequence & 1:
+                continue
+            body = BODY.unpack_from(self.buf, offset + SEQUENCE.size)
+            if SEQUENCE.unpack_from(self.buf, offset)[0] == sequence:
+                break
+        else:
+            return None
+        self._seen[address] = sequence
+
+        timestamp, ok, error = body[:3]
+        if not ok:
+            return Sample(timestamp, error.rstrip(b'\0').decode('utf-8', 'replace') or 'poll failed', None, None)
+        identity = _decode(IDENTITY_FIELDS, body[3:3 + _IDENTITY_COUNT], {})
+        data = {
+            name: int(value) if name in _INTEGER_FIELDS else value
+            for name, value in zip(_MEASUREMENT_NAMES, body[3 + _IDENTITY_COUNT:])
+        }
+        return Sample(timestamp, None, identity, data)
+
+
+class BusWorker:
+    """Polls one bus from a supervised child process.
+
+    The child is a separate interpreter that only imports this package. It
+    owns the serial port and publishes every poll into a
+    SnapshotBlock, then notifies the parent with the address over a pipe.
+    ``on_sample(address)`` is called in the parent's event loop, which reads
+    the slot with ``read(address)``. A child that dies is restarted with an
+    increasing delay.
+
+    ``addresses`` maps each address to its poll interval in seconds, a whole
+    multiple of the cycle ``interval``; an address is only polled in the
+    cycles that start on a multiple of its own interval.
+    """
+
+    def __init__(self, port, baudrate, on_sample, **settings):
+        self.port = port
+        self.baudrate = baudrate
+        self.settings = settings
+        self.on_sample = on_sample
+        self.restarts = 0
+        self._config = None
+        self._block = None
+        self._process = None
+        self._conn = None
+        self._loop = None
+        self._stopping = False
+        self._restart_delay = RESTART_DELAY
+        self._restart_handle = None
+        self._exited = None
+        self._pidfd = None
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def start(self, addresses, interval, offset=0):
+        self._loop = asyncio.get_running_loop()
+        self._config = {'addresses': dict(addresses), 'interval': interval, 'offset': offset}
+        if self._block is None:
+            self._block = SnapshotBlock.create()
+        self._stopping = False
+        self._spawn()
+
+    def configure(self, addresses, interval, offset=0):
+        self._config = {'addresses': dict(addresses), 'interval': interval, 'offset': offset}
+        if self._conn is not None:
+            try:
+                self._conn.send(self._config)
+            except OSError as e:
+                _LOGGER.debug("Could not reconfigure bus worker of %s: %s", self.port, e)
+
+    def read(self, address):
+        return self._block.read(address) if self._block is not None else None
+
+    async def async_close(self):
+        self._stopping = True
+        if self._restart_handle is not None:
+            self._restart_handle.cancel()
+            self._restart_handle = None
+        process = self._process
+        if process is not None:
+            try:
+                self._conn.send(None)
+            except OSError:
+                pass
+            try:
+                await asyncio.wait_for(asyncio.shield(self._exited), STOP_TIMEOUT)
+            except asyncio.TimeoutError:
+                _LOGGER.warning("Bus worker of %s did not stop, terminating it", self.port)
+                process.terminate()
+                await self._exited
+        if self._block is not None:
+            self._block.close(unlink=True)
+            self._block = None
+
+    def _spawn(self):
+        self._restart_handle = None
+        parent_conn, child_conn = multiprocessing.Pipe()
+        path = [_PACKAGE_ROOT] + [entry for entry in sys.path if entry]
+        try:
+            self._process = subprocess.Popen(
+                [sys.executable, '-c', _CHILD_MAIN, self._block.name, str(child_conn.fileno())],
+                pass_fds=(child_conn.fileno(),),
+                env=dict(os.environ, PYTHONPATH=os.pathsep.join(path)),
+            )
+        finally:
+            child_conn.close()
+        self._conn = parent_conn
+        self._conn.send((self.port, self.baudrate, self.settings))
+        self._conn.send(self._config)
+        self._exited = self._loop.create_future()
+        self._loop.add_reader(self._conn.fileno(), self._on_message)
+        self._watch_exit(self._process)
+        _LOGGER.debug("Bus worker for %s started as pid %s", self.port, self._process.pid)
+
+    def _watch_exit(self, process):
+        try:
+            self._pidfd = os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            # No pidfd (not Linux, or an old kernel): wait in a thread instead.
+            threading.Thread(target=self._wait_exit, args=(process,), name=f"deltainverter {self.port}", daemon=True).start()
+        else:
+            self._loop.add_reader(self._pidfd, self._on_exit)
+
+    def _wait_exit(self, process):
+        process.wait()
+        self._loop.call_soon_threadsafe(self._on_exit)
+
+    def _on_message(self):
+        try:
+            while self._conn.poll():
+                address = self._conn.recv_bytes()[0]
+                self._restart_delay = RESTART_DELAY
+                self.on_sample(address)
+        except (EOFError, OSError):
+            # The child is gone; the exit watch reports it.
+            self._loop.remove_reader(self._conn.fileno())
+
+    def _on_exit(self):
+        process = self._process
+        if self._pidfd is not None:
+            self._loop.remove_reader(self._pidfd)
+            os.close(self._pidfd)
+            self._pidfd = None
+        try:
+            self._loop.remove_reader(self._conn.fileno())
+        except (OSError, ValueError):
+            pass
+        # The pidfd is readable once the child exited, reaping it is immediate.
+        exitcode = process.wait()
+        self._conn.close()
+        self._conn = None
+        self._process = None
+        self._exited.set_result(exitcode)
+        if self._stopping:
+            return
+        self.restarts += 1
+        _LOGGER.warning("Bus worker of %s exited with %s, restarting in %s s", self.port, exitcode, self._restart_delay)
+        self._restart_handle = self._loop.call_later(self._restart_delay, self._spawn)
+        self._restart_delay = min(self._restart_delay * 2, MAX_RESTART_DELAY)
+
+
+def main():
+    """Entry point of the child process, see BusWorker._spawn."""
+    # Block name and pipe descriptor come on the command line, the line
+    # settings and then the poll schedule over the pipe.
+    conn = Connection(int(sys.argv[2]))
+    port, baudrate, settings = conn.recv()
+    run_worker(sys.argv[1], conn, port, baudrate, settings)
+
+
+def run_worker(block_name, conn, port, baudrate, settings):
+    logging.basicConfig(level=logging.WARNING, format=f"%(asctime)s %(levelname)s bus worker {port}: %(message)s")
+    block = SnapshotBlock.attach(block_name)
+    try:
+        asyncio.run(_poll(block, conn, DeltaInverterClient(port, baudrate, **settings)))
+    finally:
+        block.close()
+
+
+async def _poll(block, conn, client):
+    loop = asyncio.get_running_loop()
+    config = conn.recv()
+    changed = asyncio.Event()
+    stopped = asyncio.Event()
+
+    def on_message():
+        nonlocal config
+        try:
+            while conn.poll():
+                message = conn.recv()
+                if message is None:
+                    stopped.set()
+                    changed.set()
+                    return
+                config = message
+                changed.set()
+        except (EOFError, OSError):
+            # The parent went away.
+            stopped.set()
+            changed.set()
+
+    loop.add_reader(conn.fileno(), on_message)
+    try:
+        while not stopped.is_set():
+            # Same cycle alignment as the in-process port worker.
+            interval = config['interval']
+            now = time.time()
+            cycle = now - now % interval
+            start = cycle + config['offset']
+            if start <= now:
+                cycle += interval
+                start += interval
+            try:
+                await asyncio.wait_for(changed.wait(), start - now)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                changed.clear()
+                continue
+
+            for address, every in config['addresses'].items():
+                if stopped.is_set():
+                    break
+                if int(cycle) % every:
+                    continue
+                try:
+                    frame = await client.async_send_query(address)
+                    block.write(address, cycle, frame)
+                except Exception as e:
+                    block.write(address, cycle, error=str(e) or type(e).__name__)
+                conn.send_bytes(bytes([address]))
+    finally:
+        loop.remove_reader(conn.fileno())
+        await client.async_close()
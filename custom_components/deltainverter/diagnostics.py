@@ -0,0 +1,43 @@
+from homeassistant.components.diagnostics import async_redact_data
+
+from .const import DOMAIN, DATA_FLEET, DATA_PROFILE, CONF_IDENTITY
+from .delta_rs485 import BusWorker
+
+TO_REDACT = {"sap_serial_number"}
+
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    domain_data = hass.data[DOMAIN]
+    coordinator = domain_data.get(entry.entry_id)
+    diagnostics = {
+        "entry": {
+            "data": async_redact_data({key: value for key, value in entry.data.items() if key != CONF_IDENTITY}, TO_REDACT),
+            "options": dict(entry.options),
+            "identity": async_redact_data(entry.data.get(CONF_IDENTITY) or {}, TO_REDACT),
+        },
+        # Last profiling window of the whole integration, see the profile service.
+        "profile": domain_data.get(DATA_PROFILE),
+    }
+    if coordinator is None:
+        return diagnostics
+
+    worker = domain_data[DATA_FLEET].worker_for(coordinator.port)
+    diagnostics["coordinator"] = {
+        "poll_interval": coordinator.poll_interval,
+        "last_update_success": coordinator.last_update_success,
+        "consecutive_failures": coordinator.consecutive_failures,
+        "stale": coordinator.stale,
+        "snapshot_time": coordinator.snapshot_time.isoformat() if coordinator.snapshot_time else None,
+        "deadbands": coordinator.deadbands,
+        "active_alarms": sorted(key for key, active in coordinator.alarms.state.items() if active),
+        "data": coordinator.data,
+    }
+    if worker is not None:
+        diagnostics["port"] = {
+            "port": worker.port,
+            "transport": worker.transport,
+            "offset": worker.offset,
+            "members": len(worker.coordinators),
+            "worker_restarts": worker.client.restarts if isinstance(worker.client, BusWorker) else None,
+        }
+    return diagnostics
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import math
+import time
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from .const import PHASE_ALIGN, TRANSPORT_PROCESS, DEFAULT_TRANSPORT
+from .delta_rs485 import BusWorker, DeltaInverterClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def due(coordinators, cycle):
+    """The coordinators to poll in the cycle starting at epoch second ``cycle``."""
+    return [coordinator for coordinator in coordinators if int(cycle) % coordinator.poll_interval == 0]
+
+
+class PortWorker:
+    """Polls the inverters on one serial port, each at its own interval.
+
+    The port runs one cycle per ``interval``, the greatest common divisor of
+    the member intervals, and each cycle polls only the members due in it.
+    """
+
+    def __init__(self, hass, port, baudrate, on_polled, transport=DEFAULT_TRANSPORT, **settings):
+        self.hass = hass
+        self.port = port
+        self.on_polled = on_polled
+        self.transport = transport
+        if transport == TRANSPORT_PROCESS:
+            # The child process runs the cycles and reports each sample.
+            self.client = BusWorker(port, baudrate, self._async_on_sample, **settings)
+        else:
+            self.client = DeltaInverterClient(port, baudrate, **settings)
+        self.coordinators = []
+        self.offset = 0
+        self._task = None
+        self._reschedule = asyncio.Event()
+
+    @property
+    def interval(self):
+        # Every member interval is a whole number of cycles.
+        return math.gcd(*(coordinator.poll_interval for coordinator in self.coordinators))
+
+    def reschedule(self):
+        """Recompute the next cycle, after the interval, offset or members changed."""
+        if self.transport == TRANSPORT_PROCESS:
+            self.client.configure(self._addresses(), self.interval, self.offset)
+        self._reschedule.set()
+
+    def start(self):
+        if self.transport == TRANSPORT_PROCESS:
+            self.client.start(self._addresses(), self.interval, self.offset)
+        # With a bus worker the cycles only watch for members it went silent on.
+        self._task = self.hass.async_create_background_task(self._run(), f"deltainverter poll {self.port}")
+
+    def _addresses(self):
+        return {coordinator.address: coordinator.poll_interval for coordinator in self.coordinators}
+
+    async def async_stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.client.async_close()
+
+    @callback
+    def _async_on_sample(self, address):
+        for coordinator in self.coordinators:
+            if coordinator.address == address:
+                self.hass.async_create_task(self._async_refresh(coordinator))
+
+    async def _async_refresh(self, coordinator):
+        await coordinator.async_refresh()
+        self.on_polled(coordinator)
+
+    async def _async_refresh_silent(self, cycle):
+        """Refresh the members the bus worker published nothing for in two of
+        their intervals, e.g. while it restarts, so they fail once stale."""
+        for coordinator in list(self.coordinators):
+            last = coordinator.snapshot_time
+            if last is None or cycle - last.timestamp() > 2 * coordinator.poll_interval:
+                await coordinator.async_refresh()
+
+    async def _run(self):
+        while True:
+            interval = self.interval
+            now = time.time()
+            # Cycles start on wall clock multiples of the interval, so every
+            # port shares the same cycle boundaries whatever its phase offset.
+            cycle = now - now % interval
+            start = cycle + self.offset
+            if start <= now:
+                cycle += interval
+                start += interval
+            try:
+                await asyncio.wait_for(self._reschedule.wait(), start - now)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                self._reschedule.clear()
+                continue
+
+            if self.transport == TRANSPORT_PROCESS:
+                await self._async_refresh_silent(cycle)
+                continue
+
+            snapshot_time = dt_util.utc_from_timestamp(cycle)
+            for coordinator in due(self.coordinators, cycle):
+                # Members may be removed while an earlier one is being polled.
+                if coordinator not in self.coordinators:
+                    continue
+                coordinator.snapshot_time = snapshot_time
+                await self._async_refresh(coordinator)
+
+
+class FleetScheduler:
+    """Runs one concurrent worker per serial port and spreads their phases.
+
+    Once every inverter due in a cycle has been polled, whether its snapshot
+    changed or not, the cycle listeners are called.
+    """
+
+    def __init__(self, hass, phase):
+        self.hass = hass
+        self.phase = phase
+        self._workers = {}
+        self._cycle_listeners = []
+        self._cycle = None
+        self._due = set()
+
+    @callback
+    def async_add_cycle_listener(self, update_callback):
+        self._cycle_listeners.append(update_callback)
+
+        def remove_listener():
+            self._cycle_listeners.remove(update_callback)
+
+        return remove_listener
+
+    def client_for(self, port, baudrate, transport=DEFAULT_TRANSPORT, **settings):
+        """Client of the port, its line settings are those of the first entry on it."""
+        worker = self._workers.get(port)
+        if worker is None:
+            worker = self._workers[port] = PortWorker(self.hass, port, baudrate, self._async_polled, transport, **settings)
+        elif worker.client.baudrate != baudrate:
+            _LOGGER.warning("Port %s is already open at %s baud, ignoring %s", port, worker.client.baudrate, baudrate)
+        return worker.client
+
+    def worker_for(self, port):
+        return self._workers.get(port)
+
+    def async_add(self, coordinator):
+        worker = self._workers[coordinator.port]
+        worker.coordinators.append(coordinator)
+        if len(worker.coordinators) == 1:
+            worker.start()
+        self._rebalance()
+
+    def async_update(self, coordinator):
+        """Apply a changed poll interval of a member without reconnecting."""
+        self._rebalance()
+
+    async def async_remove(self, coordinator):
+        worker = self._workers.get(coordinator.port)
+        if worker is None or coordinator not in worker.coordinators:
+            return
+        worker.coordinators.remove(coordinator)
+        if coordinator in self._due:
+            self._due.discard(coordinator)
+            if not self._due:
+                self._async_end_cycle()
+        if not worker.coordinators:
+            del self._workers[coordinator.port]
+            await worker.async_stop()
+        self._rebalance()
+
+    @callback
+    def _async_polled(self, coordinator):
+        cycle = coordinator.snapshot_time
+        if cycle is None or (self._cycle is not None and cycle < self._cycle):
+            return
+        if cycle != self._cycle:
+            if self._due:
+                # Inverters that never got polled in the previous cycle, e.g.
+                # behind a restarting bus worker, do not hold it open any longer.
+                self._async_end_cycle()
+            self._cycle = cycle
+            timestamp = cycle.timestamp()
+            self._due = {
+                member
+                for worker in self._workers.values()
+                for member in due(worker.coordinators, timestamp)
+            }
+        self._due.discard(coordinator)
+        if not self._due:
+            self._async_end_cycle()
+
+    @callback
+    def _async_end_cycle(self):
+        self._due = set()
+        for update_callback in list(self._cycle_listeners):
+            update_callback()
+
+    def _rebalance(self):
+        workers = [self._workers[port] for port in sorted(self._workers)]
+        for index, worker in enumerate(workers):
+            if self.phase == PHASE_ALIGN or not worker.coordinators:
+                worker.offset = 0
+            else:
+                # Spread the ports evenly over the cycle so their serial I/O
+                # and the resulting state writes do not land on the loop together.
+                worker.offset = index * worker.interval / len(workers)
+        _LOGGER.debug("Fleet phases: %s", {worker.port: worker.offset for worker in workers})
+        # The offsets of every port depend on the intervals and the number of ports.
+        for worker in workers:
+            if worker.coordinators:
+                worker.reschedule()
@@ -0,0 +1,126 @@
+import logging
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+PLANT_ATTRIBUTES = {
+    "plant_ac_power": {"friendly_name": "AC Power", "unit_of_measurement": "W", "device_class": "power", "state_class": "measurement"},
+    "plant_energy_today": {"friendly_name": "Supplied AC Energy of Today", "unit_of_measurement": "kWh", "device_class": "energy", "state_class": "total_increasing"},
+    "plant_energy_total": {"friendly_name": "Supplied AC Energy", "unit_of_measurement": "kWh", "device_class": "energy", "state_class": "total_increasing"},
+    "plant_max_temperature": {"friendly_name": "Maximum Temperature", "unit_of_measurement": "°C", "device_class": "temperature", "state_class": "measurement"},
+    "plant_min_isolation_resistance": {"friendly_name": "Minimum Isolation Resistance", "unit_of_measurement": "Ω", "device_class": None, "state_class": "measurement"},
+    "plant_inverters_online": {"friendly_name": "Inverters Online", "unit_of_measurement": None, "device_class": None, "state_class": "measurement"},
+}
+
+_EMPTY = {
+    "available": False,
+    "ac_power": 0,
+    "energy_today": 0,
+    "energy_today_date": None,
+    "energy_total": 0,
+    "temperature": None,
+    "isolation": None,
+}
+
+
+def _contribution(data, previous):
+    if not data:
+        # Asleep or stale: no live power, but the energy counters keep their
+        # last known values so the totals do not drop overnight.
+        return {**previous, "available": False, "ac_power": 0, "temperature": None, "isolation": None}
+    return {
+        "available": True,
+        "ac_power": data.get("ac_power") or 0,
+        "energy_today": data.get("supplied_ac_energy_of_today") or 0,
+        "energy_today_date": dt_util.now().date(),
+        "energy_total": data.get("supplied_ac_energy") or 0,
+        "temperature": max(data.get("calculated_temperature_at_ntc_dc_side", 0), data.get("calculated_temperature_at_ntc_ac_side", 0)),
+        "isolation": min(data.get("solar_isolation_resistance_at_input_1", 0), data.get("solar_isolation_resistance_at_input_2", 0)),
+    }
+
+
+class PlantAggregator:
+    """Plant totals across all inverters, maintained from each coordinator's snapshot.
+
+    The totals are kept up to date as members change and published when the
+    FleetScheduler reports the end of a poll cycle.
+
+    The energy totals are total_increasing, any drop reads as a meter reset
+    to the recorder. They are therefore published as None until every member
+    has sent a sample since startup, and a removed member's counters stay in
+    them for the rest of the run (a reloaded entry picks them up again).
+    """
+
+    def __init__(self, hass):
+        self.hass = hass
+        self.data = {}
+        self.owner = None
+        self._members = {}
+        self._active = set()
+        self._reported = set()
+        self._sums = {"ac_power": 0, "energy_today": 0, "energy_total": 0}
+        self._day = dt_util.now().date()
+        self._listeners = []
+
+    @callback
+    def async_add_listener(self, update_callback):
+        self._listeners.append(update_callback)
+
+        def remove_listener():
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_update_member(self, coordinator):
+        entry_id = coordinator.entry.entry_id
+        previous = self._members.get(entry_id, _EMPTY)
+        data = coordinator.data if coordinator.last_update_success else None
+        current = _contribution(data, previous)
+        self._active.add(entry_id)
+        if data:
+            self._reported.add(entry_id)
+
+        self._sums["ac_power"] += current["ac_power"] - previous["ac_power"]
+        self._sums["energy_total"] += current["energy_total"] - previous["energy_total"]
+        self._sums["energy_today"] += self._today(current) - self._today(previous)
+        self._members[entry_id] = current
+
+    @callback
+    def async_remove_member(self, entry_id):
+        previous = self._members.get(entry_id)
+        if previous is None:
+            return
+        self._active.discard(entry_id)
+        self._reported.discard(entry_id)
+        self._sums["ac_power"] -= previous["ac_power"]
+        self._members[entry_id] = _contribution(None, previous)
+        self.async_publish()
+
+    def _today(self, member):
+        return member["energy_today"] if member["energy_today_date"] == self._day else 0
+
+    @callback
+    def async_publish(self):
+        today = dt_util.now().date()
+        if today != self._day:
+            # Daily counters of members that have not reported today are yesterday's.
+            self._day = today
+            self._sums["energy_today"] = sum(self._today(member) for member in self._members.values())
+
+        online = [member for member in self._members.values() if member["available"]]
+        # A member without a sample yet would count with zero energy.
+        complete = self._active <= self._reported
+        self.data = {
+            "plant_ac_power": round(self._sums["ac_power"], 3),
+            "plant_energy_today": round(self._sums["energy_today"], 3) if complete else None,
+            "plant_energy_total": round(self._sums["energy_total"], 3) if complete else None,
+            "plant_max_temperature": max((member["temperature"] for member in online), default=None),
+            "plant_min_isolation_resistance": min((member["isolation"] for member in online), default=None),
+            "plant_inverters_online": len(online),
+        }
+        _LOGGER.debug("Plant aggregate published: %s", self.data)
+        for update_callback in list(self._listeners):
+            update_callback()
@@ -0,0 +1,162 @@
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+
+import voluptuous as vol
+
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, DATA_PROFILE
+from .delta_rs485 import TRACER
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_PROFILE = "profile"
+
+ATTR_DURATION = "duration"
+ATTR_MODE = "mode"
+
+MODE_SPANS = "spans"
+MODE_CPROFILE = "cprofile"
+MODE_TRACEMALLOC = "tracemalloc"
+
+MAX_DURATION = 600
+LAG_PROBE_INTERVAL = 0.1
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+SERVICE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DURATION, default=60): vol.All(vol.Coerce(float), vol.Range(min=1, max=MAX_DURATION)),
+    vol.Optional(ATTR_MODE, default=MODE_SPANS): vol.In([MODE_SPANS, MODE_CPROFILE, MODE_TRACEMALLOC]),
+})
+
+
+class ProfileRun:
+    """One bounded profiling window: timing spans, loop lag and an optional profiler."""
+
+    def __init__(self, hass, duration, mode):
+        self.hass = hass
+        self.duration = duration
+        self.mode = mode
+        self.started = dt_util.utcnow()
+        self._profile = None
+        self._tracemalloc_started = False
+        self._snapshot = None
+
+    def start(self):
+        TRACER.start()
+        if self.mode == MODE_CPROFILE:
+            # Profiles the event loop thread, where the lag comes from. Raises
+            # when another profiler is active, e.g. Home Assistant's own.
+            profile = cProfile.Profile()
+            profile.enable()
+            self._profile = profile
+        elif self.mode == MODE_TRACEMALLOC:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self._tracemalloc_started = True
+            self._snapshot = tracemalloc.take_snapshot()
+
+    async def async_run(self):
+        loop = asyncio.get_running_loop()
+        end = loop.time() + self.duration
+        try:
+            # Inside the try: a profiler that fails to start must not leave
+            # the tracer enabled.
+            self.start()
+            # The loop lag probe: how late a short sleep wakes up.
+            while loop.time() < end:
+                before = time.perf_counter()
+                await asyncio.sleep(LAG_PROBE_INTERVAL)
+                TRACER.record("loop_lag", max(0, time.perf_counter() - before - LAG_PROBE_INTERVAL))
+        finally:
+            report = self.stop()
+        return report
+
+    def stop(self):
+        report = {
+            "started": self.started.isoformat(),
+            "duration": self.duration,
+            "mode": self.mode,
+            "spans": TRACER.stop(),
+        }
+        if self._profile is not None:
+            self._profile.disable()
+            report["cprofile"] = self._profile
+        if self._snapshot is not None:
+            snapshot = tracemalloc.take_snapshot()
+            report["tracemalloc"] = [
+                {"location": str(stat.traceback), "size_diff_kib": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+                for stat in snapshot.compare_to(self._snapshot, "lineno")[:TOP_ALLOCATIONS]
+            ]
+        if self._tracemalloc_started:
+            tracemalloc.stop()
+        return report
+
+
+def format_report(report):
+    lines = [f"Delta inverter profile, {report['mode']}, {report['duration']:g} s from {report['started']}", ""]
+    lines.append(f"{'stage':<14}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'total ms':>12}")
+    for stage, span in sorted(report["spans"].items()):
+        lines.append(
+            f"{stage:<14}{span['count']:>8}{span['mean_ms']:>10.3f}{span['p50_ms']:>10.3f}{span['p95_ms']:>10.3f}"
+            f"{span['p99_ms']:>10.3f}{span['max_ms']:>10.3f}{span['total_ms']:>12.1f}"
+        )
+    if report.get("cprofile_text"):
+        lines += ["", report["cprofile_text"]]
+    if report.get("tracemalloc"):
+        lines += ["", "Allocation growth by line:"]
+        lines += [f"{stat['size_diff_kib']:>10.1f} KiB {stat['count_diff']:>+8}  {stat['location']}" for stat in report["tracemalloc"]]
+    return "\n".join(lines) + "\n"
+
+
+def _write_report(path, report):
+    profile = report.pop("cprofile", None)
+    if profile is not None:
+        profile.dump_stats(path + ".prof")
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        report["cprofile_text"] = stream.getvalue()
+        report["cprofile_file"] = path + ".prof"
+    with open(path + ".txt", "w") as output:
+        output.write(format_report(report))
+    with open(path + ".json", "w") as output:
+        json.dump({key: value for key, value in report.items() if key != "cprofile_text"}, output, indent=2)
+    report["file"] = path + ".txt"
+    return report
+
+
+@callback
+def async_register_services(hass):
+    async def async_profile_service(call):
+        domain_data = hass.data[DOMAIN]
+        if domain_data.get(DATA_PROFILE, {}).get("running"):
+            raise HomeAssistantError("A profiling run is already in progress")
+        run = ProfileRun(hass, call.data[ATTR_DURATION], call.data[ATTR_MODE])
+        domain_data[DATA_PROFILE] = {"running": True, "started": run.started.isoformat()}
+        _LOGGER.info("Profiling the Delta inverter poll path for %s s (%s)", run.duration, run.mode)
+
+        async def async_finish():
+            # Also reached when the run is cancelled, e.g. on shutdown.
+            state = {"running": False}
+            try:
+                report = await run.async_run()
+                path = hass.config.path(f"deltainverter_profile_{run.started.strftime('%Y%m%d_%H%M%S')}")
+                report = await hass.async_add_executor_job(_write_report, path, report)
+                _LOGGER.info("Profile written to %s", report["file"])
+                report.pop("cprofile_text", None)
+                state["last_report"] = report
+            finally:
+                domain_data[DATA_PROFILE] = state
+
+        # The service returns right away; the window runs in the background.
+        hass.async_create_background_task(async_finish(), "deltainverter profile")
+
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, async_profile_service, schema=SERVICE_SCHEMA)
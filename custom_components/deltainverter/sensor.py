@@ -1,157 +1,55 @@
 import logging
-import json
-from datetime import timedelta
-import voluptuous as vol
-import serial_asyncio
-import struct
-import asyncio
 
-from homeassistant.components.sensor import PLATFORM_SCHEMA
-from homeassistant.helpers.entity import Entity
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-import homeassistant.helpers.config_validation as cv
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, DEFAULT_UPDATE_INTERVAL, ATTRIBUTES
-from .data_parser import parse_data
+from .const import DOMAIN, DATA_PLANT, ATTRIBUTES
+from .plant import PLANT_ATTRIBUTES
 
 _LOGGER = logging.getLogger(__name__)
 
 CONF_NAME = "name"
 
-PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
-    vol.Required(CONF_NAME): cv.string,
-    vol.Optional("update_interval", default=DEFAULT_UPDATE_INTERVAL): cv.positive_int,
-})
 
-async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
-    _LOGGER.debug("Setting up platform with config: %s and discovery_info: %s", config, discovery_info)
-    if discovery_info is None:
-        _LOGGER.error("No configuration data received")
-        return
+def sensor_unique_id(name, attribute):
+    return f"sensor.{name.lower().replace(' ', '_')}_{attribute}"
+
 
-    name = discovery_info.get(CONF_NAME)
+async def async_setup_entry(hass, entry, async_add_entities):
+    _LOGGER.debug("Setting up sensors for entry: %s", entry.data)
+    name = entry.data.get(CONF_NAME)
     if not name:
         _LOGGER.error("Configuration is missing CONF_NAME")
         return
 
-    update_interval = discovery_info.get("update_interval", DEFAULT_UPDATE_INTERVAL)
-    coordinator = DeltaInverterDataUpdateCoordinator(hass, update_interval)
-    await coordinator.async_refresh()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
 
     sensors = []
-    for attr in ATTRIBUTES:
+    for attr in coordinator.attributes:
         sensors.append(DeltaInverterSensor(name, attr, coordinator))
+
+    # Plant totals only make sense with several inverters; the first entry
+    # set up in that situation owns the shared plant entities, and when it is
+    # unloaded another one takes them over.
+    plant = hass.data[DOMAIN][DATA_PLANT]
+    loaded = [other for other in hass.config_entries.async_entries(DOMAIN) if other.entry_id in hass.data[DOMAIN]]
+    if plant.owner in (None, entry.entry_id) and len(loaded) > 1:
+        plant.owner = entry.entry_id
+        for key in PLANT_ATTRIBUTES:
+            sensors.append(DeltaPlantSensor(plant, key))
     async_add_entities(sensors)
     _LOGGER.debug("Platform setup complete with sensors: %s", sensors)
 
 
-class DeltaInverterDataUpdateCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass, update_interval):
-        self._data = {}
-        self.port = '/dev/ttyUSB0'
-        self.baudrate = 9600
-        _LOGGER.debug("Data update coordinator initialized with interval: %s seconds", update_interval)
-
-        super().__init__(
-            hass,
-            _LOGGER,
-            name="Delta Inverter",
-            update_method=self._async_update_data,
-            update_interval=timedelta(seconds=update_interval),
-        )
-
-    async def _async_update_data(self):
-        _LOGGER.debug("Fetching data from serial line: %s", self.port)
-        try:
-            data = await self.async_send_query()
-            if data:
-                _LOGGER.debug("Data fetched successfully: %s", data)
-                self._data = parse_data(data)
-                _LOGGER.debug("Data parsed successfully: %s", self._data)
-            else:
-                _LOGGER.error("Error fetching data from %s", self.port)
-                self._data = {}
-        except Exception as e:
-            _LOGGER.error("Exception occurred while fetching data: %s", e)
-            raise UpdateFailed(f"Error updating data: {e}")
-
-    def get_data(self, attribute):
-        _LOGGER.debug("Getting data for attribute: %s", attribute)
-        data = self._data.get(attribute, None)
-        _LOGGER.debug("Data for %s: %s", attribute, data)
-        return data
-
-    async def async_send_query(self):
-        address = 1
-        command = 96
-        sub_command = 1
-        data = b''
-
-        query = self.create_query(address, command, sub_command, data)
-        _LOGGER.debug("XXXXX %s", query)
-
-        
-        reader, writer = await serial_asyncio.open_serial_connection(url=self.port, baudrate=self.baudrate, timeout=10)
-        try:
-            writer.write(query)
-            await writer.drain()
-
-            response = b''
-            while True:
-                part = await reader.read(1024)  # Čteme po 1024 bytech
-                if not part:
-                    break
-                response += part
-                _LOGGER.debug("Received part: %s", part)
-
-                # Ukončení čtení na základě specifického ukončovacího znaku nebo délky
-                if response.endswith(b'\x03'):  # ETX znak
-                    break
-
-            _LOGGER.debug("Complete response: %s", response)
-            return response
-        except Exception as e:
-            _LOGGER.error("Exception occurred while sending query: %s", e)
-            raise
-        finally:
-            writer.close()
-            await writer.wait_closed()
-
-    def calc_crc(self, data):
-        crc = 0x0000
-        for pos in data:
-            crc ^= pos
-            for _ in range(8):
-                if crc & 0x0001:
-                    crc >>= 1
-                    crc ^= 0xA001
-                else:
-                    crc >>= 1
-        return crc
-
-    def create_query(self, address, command, sub_command, data=b''):
-        stx = 0x02
-        enq = 0x05
-        etx = 0x03
-
-        frame = struct.pack('BB', stx, enq) + struct.pack('B', address) + struct.pack('B', len(data) + 2) + struct.pack('B', command) + struct.pack('B', sub_command) + data
-
-        crc = self.calc_crc(frame[1:])
-        crc_low = crc & 0xFF
-        crc_high = (crc >> 8) & 0xFF
-
-        frame += struct.pack('BB', crc_low, crc_high) + struct.pack('B', etx)
-        return frame
-
-
-class DeltaInverterSensor(Entity):
+class DeltaInverterSensor(CoordinatorEntity, SensorEntity):
     def __init__(self, name, attribute, coordinator):
+        super().__init__(coordinator)
         self._name = f"{name} {ATTRIBUTES[attribute]['friendly_name']}"
-        self._state = None
         self._attribute = attribute
-        self._coordinator = coordinator
-        self.entity_id = f"sensor.{name.lower().replace(' ', '_')}_{attribute}"
+        self.entity_id = sensor_unique_id(name, attribute)
         self._unique_id = f"{self.entity_id}"
+        self._written = None
         _LOGGER.debug("Sensor initialized: %s", self._name)
 
     @property
@@ -163,29 +61,95 @@ class DeltaInverterSensor(Entity):
         return self._name
 
     @property
-    def state(self):
-        return self._state
+    def native_value(self):
+        # Availability is tracked once per inverter by the coordinator, not per value.
+        return self.coordinator.get_data(self._attribute)
+
+    @property
+    def native_unit_of_measurement(self):
+        return ATTRIBUTES[self._attribute]["unit_of_measurement"] or None
+
+    @property
+    def state_class(self):
+        return ATTRIBUTES[self._attribute].get("state_class")
+
+    @property
+    def device_info(self):
+        # All sensors of one inverter share a single device, keyed on its serial number.
+        return self.coordinator.device_info
+
+    @callback
+    def _handle_coordinator_update(self):
+        available = self.available
+        value = self.native_value
+        if self._written is not None and self._written[0] == available:
+            previous = self._written[1]
+            if value == previous:
+                return
+            deadband = self.coordinator.deadbands.get(ATTRIBUTES[self._attribute]["device_class"])
+            if deadband and isinstance(value, (int, float)) and isinstance(previous, (int, float)) and abs(value - previous) < deadband:
+                return
+        self._written = (available, value)
+        self.async_write_ha_state()
+
+class DeltaPlantSensor(SensorEntity):
+    def __init__(self, plant, key):
+        self._plant = plant
+        self._key = key
+        self._name = f"Delta Plant {PLANT_ATTRIBUTES[key]['friendly_name']}"
+        self.entity_id = f"sensor.delta_{key}"
+        self._unique_id = f"{DOMAIN}_{key}"
+        self._written = None
+
+    @property
+    def should_poll(self):
+        return False
+
+    @property
+    def unique_id(self):
+        return self._unique_id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def native_value(self):
+        return self._plant.data.get(self._key)
 
     @property
-    def unit_of_measurement(self):
-        return ATTRIBUTES[self._attribute]["unit_of_measurement"]
+    def native_unit_of_measurement(self):
+        return PLANT_ATTRIBUTES[self._key]["unit_of_measurement"]
 
-    async def async_update(self):
-        _LOGGER.debug("Updating sensor: %s", self._name)
-        self._state = self._coordinator.get_data(self._attribute)
-        _LOGGER.debug("Updated state for %s: %s", self._name, self._state)
+    @property
+    def device_class(self):
+        return PLANT_ATTRIBUTES[self._key]["device_class"]
+
+    @property
+    def state_class(self):
+        return PLANT_ATTRIBUTES[self._key]["state_class"]
 
     @property
     def device_info(self):
         return {
-            "identifiers": {(DOMAIN, self.unique_id)},
-            "name": self.name,
+            "identifiers": {(DOMAIN, DATA_PLANT)},
+            "name": "Delta Plant",
             "manufacturer": "Delta",
-            "model": "Inverter Model",
-            "entry_type": "service",
-            "configuration_url": "https://ha.matyho.cz/config/integrations/integration/deltainverter",
+            "model": "Plant",
         }
 
+    async def async_added_to_hass(self):
+        self.async_on_remove(self._plant.async_add_listener(self._handle_plant_update))
+
+    @callback
+    def _handle_plant_update(self):
+        # The aggregate is published once per cycle; skip unchanged values.
+        value = self.native_value
+        if value == self._written:
+            return
+        self._written = value
+        self.async_write_ha_state()
+
 # import asyncio
 # from datetime import timedelta
 # from homeassistant.helpers.entity import Entity
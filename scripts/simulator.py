@@ -0,0 +1,214 @@
+"""Simulated Delta inverters serving the RS485 protocol on pseudo terminals.
+
+Only used by soak_fleet.py; run from the repository root so the
+``custom_components`` package is importable.
+"""
+import asyncio
+import logging
+import math
+import os
+import random
+import time
+import tty
+
+from custom_components.deltainverter.delta_rs485.data_parser import (
+    IDENTITY_FIELDS,
+    MEASUREMENT_FIELDS,
+    _IDENTITY,
+    _MEASUREMENTS,
+    _encode,
+)
+from custom_components.deltainverter.delta_rs485.protocol import ACK, ENQ, ETX, STX, calc_crc, frame_length
+
+_LOGGER = logging.getLogger(__name__)
+
+SUNRISE = 6
+SUNSET = 18
+# The inverter wakes up a little before sunrise and keeps answering a little after sunset.
+AWAKE_MARGIN = 0.5
+
+
+def encode_data(values):
+    """Build the payload of a measurement response, the inverse of parse_data."""
+    return _IDENTITY.pack(*_encode(IDENTITY_FIELDS, values)) + _MEASUREMENTS.pack(*_encode(MEASUREMENT_FIELDS, values))
+
+
+def create_response(address, command, sub_command, data=b''):
+    """The inverter's answer to create_query."""
+    frame = bytes([STX, ACK, address, len(data) + 2, command, sub_command]) + data
+    crc = calc_crc(frame[1:])
+    return frame + bytes([crc & 0xFF, crc >> 8, ETX])
+
+
+class SimulatedInverter:
+    """Produces plausible measurement frames for one inverter along a day/night cycle.
+
+    Times are epoch seconds of whatever clock drives the simulation, the hour
+    of day is taken in UTC.
+    """
+
+    def __init__(self, address, serial_number, rated_power=5000, alarm_rate=0.0, seed=None):
+        self.address = address
+        self.serial_number = serial_number
+        self.rated_power = rated_power
+        self.alarm_rate = alarm_rate
+        self._random = random.Random(seed)
+        self.energy_total = self._random.uniform(1000, 20000)
+        self.runtime_total = int(self.energy_total / rated_power * 1000 * 2)
+        self.energy_today = 0
+        self.runtime_today = 0
+        self.max_power_today = 0
+        self._day = None
+        self._last = None
+
+    def awake(self, t):
+        hour = t % 86400 / 3600
+        return SUNRISE - AWAKE_MARGIN <= hour <= SUNSET + AWAKE_MARGIN
+
+    def power(self, t):
+        hour = t % 86400 / 3600
+        if not SUNRISE < hour < SUNSET:
+            return 0
+        sun = math.sin(math.pi * (hour - SUNRISE) / (SUNSET - SUNRISE))
+        clouds = 0.75 + 0.25 * self._random.random()
+        return round(self.rated_power * sun * clouds)
+
+    def sample(self, t):
+        if not self.awake(t):
+            self._last = None
+            return None
+
+        day = int(t // 86400)
+        if day != self._day:
+            self._day = day
+            self.energy_today = 0
+            self.runtime_today = 0
+            self.max_power_today = 0
+
+        power = self.power(t)
+        if self._last is not None:
+            elapsed = max(0, t - self._last)
+            self.energy_today += power * elapsed / 3600 / 1000
+            self.energy_total += power * elapsed / 3600 / 1000
+            self.runtime_today += elapsed / 60
+        self._last = t
+        self.max_power_today = max(self.max_power_today, power)
+
+        dc_voltage = 300 + 80 * power / self.rated_power if power else 120
+        ac_voltage = 230 + self._random.uniform(-3, 3)
+        alarm = self._random.random() < self.alarm_rate
+        return {
+            "sap_part_number": "EOE46020145",
+            "sap_serial_number": self.serial_number,
+            "sap_date_code": 1003,
+            "sap_revision": 2,
+            "software_revision_ac_control": 0x0200,
+            "software_revision_dc_control": 0x0200,
+            "software_revision_display": 0x0200,
+            "software_revision_ens_control": 0x0200,
+            "solar_current_at_input_1": power / 2 / dc_voltage,
+            "solar_voltage_at_input_1": dc_voltage,
+            "solar_isolation_resistance_at_input_1": 10000,
+            "solar_current_at_input_2": power / 2 / dc_voltage,
+            "solar_voltage_at_input_2": dc_voltage,
+            "solar_isolation_resistance_at_input_2": 10000,
+            "ac_current": power / ac_voltage,
+            "ac_voltage": ac_voltage,
+            "ac_power": power,
+            "ac_frequency": 50 + self._random.uniform(-0.05, 0.05),
+            "supplied_ac_energy_of_today": self.energy_today,
+            "inverter_runtime_of_today": self.runtime_today,
+            "calculated_temperature_at_ntc_dc_side": 25 + 30 * power / self.rated_power,
+            "calculated_temperature_at_ntc_ac_side": 25 + 25 * power / self.rated_power,
+            "maximum_ac_power_of_today": self.max_power_today,
+            "supplied_ac_energy": self.energy_total,
+            "inverter_runtime": self.runtime_total + int(self.runtime_today / 60),
+            "status_ac_output": 0b1100 if power else 0,
+            # An occasional short grid frequency excursion exercises the alarm path.
+            "limits_ac_output": 0b100 if alarm else 0,
+        }
+
+
+class SimulatedBus:
+    """Serves a set of simulated inverters on a pseudo terminal.
+
+    ``port`` is the path of the slave side, which can be opened like any
+    serial port. With ``echo`` every query is sent back before the answer,
+    like adapters without receiver disable do. Must be opened from a running
+    event loop.
+    """
+
+    def __init__(self, inverters=(), clock=time.time, echo=False):
+        self.inverters = {inverter.address: inverter for inverter in inverters}
+        self.clock = clock
+        self.echo = echo
+        self.port = None
+        self.queries = 0
+        self.responses = 0
+        self.fault_until = 0
+        self._master = None
+        self._slave = None
+        self._buffer = b''
+
+    def add(self, inverter):
+        self.inverters[inverter.address] = inverter
+
+    def open(self):
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        os.set_blocking(self._master, False)
+        self.port = os.ttyname(self._slave)
+        asyncio.get_running_loop().add_reader(self._master, self._on_readable)
+        _LOGGER.debug("Simulated bus with %s inverters on %s", len(self.inverters), self.port)
+
+    def close(self):
+        if self._master is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._master)
+        os.close(self._master)
+        # The slave side is kept open until now so the pty does not hang up
+        # whenever the client reconnects.
+        os.close(self._slave)
+        self._master = self._slave = None
+
+    def inject_fault(self, duration):
+        """Stop answering for ``duration`` seconds of the simulation clock."""
+        self.fault_until = self.clock() + duration
+
+    def _on_readable(self):
+        try:
+            self._buffer += os.read(self._master, 4096)
+        except (BlockingIOError, OSError):
+            return
+        while True:
+            start = self._buffer.find(bytes([STX]))
+            if start < 0:
+                self._buffer = b''
+                return
+            self._buffer = self._buffer[start:]
+            if len(self._buffer) < 4:
+                return
+            length = frame_length(self._buffer)
+            if len(self._buffer) < length:
+                return
+            frame, self._buffer = self._buffer[:length], self._buffer[length:]
+            self._handle(frame)
+
+    def _handle(self, frame):
+        if frame[1] != ENQ:
+            return
+        if self.echo:
+            os.write(self._master, frame)
+        crc = calc_crc(frame[1:-3])
+        if frame[-3] != crc & 0xFF or frame[-2] != crc >> 8:
+            return
+        self.queries += 1
+        now = self.clock()
+        inverter = self.inverters.get(frame[2])
+        if inverter is None or now < self.fault_until:
+            return
+        values = inverter.sample(now)
+        if values is None:
+            return
+        self.responses += 1
+        os.write(self._master, create_response(inverter.address, frame[4], frame[5], encode_data(values)))
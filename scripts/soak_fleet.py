@@ -0,0 +1,294 @@
+"""Soak test a fleet of simulated Delta inverters.
+
+Runs the real integration (coordinators, fleet scheduler, sensor and alarm
+entities) in a minimal Home Assistant test instance against N simulated
+inverters spread over M pseudo-terminal buses. The whole process runs on a
+clock ``--speed`` times faster than real time, so a simulated day with its
+night-time silence and injected bus faults passes in minutes. At the end it
+reports event loop lag, state writes, memory growth and how long the
+coordinators took to recover from each fault.
+
+Needs Home Assistant and its test helpers next to pyserial-asyncio:
+
+    pip install pytest-homeassistant-custom-component pyserial-asyncio
+    python scripts/soak_fleet.py --inverters 40 --buses 4 --speed 60
+"""
+import argparse
+import asyncio
+import os
+import random
+import selectors
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from homeassistant import loader  # noqa: E402
+from homeassistant.const import EVENT_STATE_CHANGED  # noqa: E402
+from homeassistant.setup import async_setup_component  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.deltainverter.const import DOMAIN  # noqa: E402
+from simulator import SimulatedBus, SimulatedInverter  # noqa: E402
+
+PROBE_INTERVAL = 1
+SAMPLE_INTERVAL = 60
+
+
+class AcceleratedClock:
+    """time.time and time.monotonic running ``speed`` times faster than real time.
+
+    asyncio reads time.monotonic for its timers, so installing the clock also
+    speeds up every sleep and scheduled callback, including Home Assistant's.
+    dt_util.utcnow and dt_util.now follow the clock as well, which covers the
+    integration and everything calling them through the module; code that
+    imported the functions themselves, or calls datetime.now directly, still
+    sees real time. time.perf_counter is left alone and measures real time.
+    """
+
+    def __init__(self, speed, start):
+        self.speed = speed
+        self._real_time = time.time
+        self._real_monotonic = time.monotonic
+        self._real_utcnow = dt_util.utcnow
+        self._real_now = dt_util.now
+        self._origin = self._real_monotonic()
+        self._monotonic_start = self._origin
+        self._start = start
+
+    def elapsed(self):
+        return (self._real_monotonic() - self._origin) * self.speed
+
+    def time(self):
+        return self._start + self.elapsed()
+
+    def monotonic(self):
+        return self._monotonic_start + self.elapsed()
+
+    def utcnow(self):
+        return dt_util.utc_from_timestamp(self.time())
+
+    def now(self, time_zone=None):
+        return datetime.fromtimestamp(self.time(), time_zone or dt_util.DEFAULT_TIME_ZONE)
+
+    def install(self):
+        time.time = self.time
+        time.monotonic = self.monotonic
+        dt_util.utcnow = self.utcnow
+        dt_util.now = self.now
+
+    def uninstall(self):
+        time.time = self._real_time
+        time.monotonic = self._real_monotonic
+        dt_util.utcnow = self._real_utcnow
+        dt_util.now = self._real_now
+
+
+class ScaledSelector:
+    """Selector whose timeouts are given in accelerated seconds."""
+
+    def __init__(self, selector, speed):
+        self._selector = selector
+        self._speed = speed
+
+    def select(self, timeout=None):
+        if timeout is not None:
+            timeout /= self._speed
+        return self._selector.select(timeout)
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class Soak:
+    def __init__(self, hass, clock, buses, coordinators, args):
+        self.hass = hass
+        self.clock = clock
+        self.buses = buses
+        self.coordinators = coordinators
+        self.args = args
+        self.lag = []
+        self.rss = []
+        self.writes = 0
+        self.write_rate = []
+        self.recoveries = []
+        self._faults = []
+        self._random = random.Random(args.seed)
+
+    def _count_write(self, event):
+        self.writes += 1
+
+    async def run(self):
+        self.hass.bus.async_listen(EVENT_STATE_CHANGED, self._count_write)
+        duration = self.args.hours * 3600
+        end = self.clock.monotonic() + duration
+        next_sample = self.clock.monotonic()
+        next_fault = self.clock.monotonic() + self.args.fault_every
+        writes_at_sample = self.writes
+        real_at_sample = time.perf_counter()
+
+        while self.clock.monotonic() < end:
+            real = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            # Anything beyond the expected real sleep is time the loop was busy.
+            self.lag.append(time.perf_counter() - real - PROBE_INTERVAL / self.clock.speed)
+
+            now = self.clock.monotonic()
+            if now >= next_sample:
+                next_sample += SAMPLE_INTERVAL
+                self.rss.append(rss_bytes())
+                real_now = time.perf_counter()
+                self.write_rate.append((self.writes - writes_at_sample) / (real_now - real_at_sample))
+                writes_at_sample, real_at_sample = self.writes, real_now
+
+            if self.args.fault_every and now >= next_fault:
+                next_fault += self.args.fault_every
+                self._inject_fault(now)
+            self._check_recoveries(now)
+
+    def _inject_fault(self, now):
+        bus = self._random.choice(self.buses)
+        awake = [
+            coordinator for coordinator in self.coordinators
+            if coordinator.port == bus.port and bus.inverters[coordinator.address].awake(self.clock.time())
+        ]
+        if not awake:
+            return
+        bus.inject_fault(self.args.fault_duration)
+        self._faults.append((now + self.args.fault_duration, awake, {}))
+
+    def _check_recoveries(self, now):
+        for fault in list(self._faults):
+            fault_end, coordinators, recovered = fault
+            for coordinator in coordinators:
+                if coordinator not in recovered and coordinator.last_success and coordinator.last_success > fault_end:
+                    recovered[coordinator] = coordinator.last_success - fault_end
+            if len(recovered) == len(coordinators):
+                self.recoveries.append(max(recovered.values()))
+                self._faults.remove(fault)
+            elif now - fault_end > 3600:
+                # Went to sleep or never came back; count it as unrecovered.
+                self.recoveries.append(float("inf"))
+                self._faults.remove(fault)
+
+    def report(self, real_seconds):
+        args = self.args
+        lag_ms = [value * 1000 for value in self.lag]
+        growth = (self.rss[-1] - self.rss[min(1, len(self.rss) - 1)]) / 2**20 if self.rss else 0
+        queries = sum(bus.queries for bus in self.buses)
+        responses = sum(bus.responses for bus in self.buses)
+        finite = [value for value in self.recoveries if value != float("inf")]
+        lines = [
+            f"Simulated {args.hours:g} h in {real_seconds:.0f} s real ({args.speed:g}x)",
+            f"Fleet:            {args.inverters} inverters on {args.buses} buses, interval {args.interval} s, phase {args.phase}",
+            f"Bus traffic:      {queries} queries, {responses} responses",
+            f"Loop lag (ms):    p50 {percentile(lag_ms, 0.5):.2f}  p95 {percentile(lag_ms, 0.95):.2f}"
+            f"  p99 {percentile(lag_ms, 0.99):.2f}  max {max(lag_ms, default=0):.2f}",
+            f"State writes:     {self.writes} total, {self.writes / real_seconds:.1f}/s real,"
+            f" {self.writes / args.hours:.0f}/simulated h, peak {max(self.write_rate, default=0):.1f}/s",
+            f"RSS (MiB):        start {self.rss[0] / 2**20:.1f}  end {self.rss[-1] / 2**20:.1f}  growth {growth:+.1f}"
+            if self.rss else "RSS:              no samples",
+            f"Faults:           {len(self.recoveries)} injected, {len(self.recoveries) - len(finite)} unrecovered",
+            f"Recovery (sim s): p50 {percentile(finite, 0.5):.1f}  max {max(finite, default=0):.1f}",
+        ]
+        return "\n".join(lines)
+
+
+async def async_main(args, clock):
+    buses = [SimulatedBus(clock=clock.time) for _ in range(args.buses)]
+    for index in range(args.inverters):
+        bus = buses[index % args.buses]
+        bus.add(SimulatedInverter(
+            address=len(bus.inverters) + 1,
+            serial_number=f"SIM{index:06d}",
+            alarm_rate=args.alarm_rate,
+            seed=args.seed + index,
+        ))
+    for bus in buses:
+        bus.open()
+
+    try:
+        async with async_test_home_assistant() as hass:
+            # Let the loader pick up custom_components/ from the repository.
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+            entries = []
+            for bus in buses:
+                for address in bus.inverters:
+                    entry = MockConfigEntry(
+                        domain=DOMAIN,
+                        title=f"Inverter {len(entries) + 1}",
+                        data={
+                            "name": f"Inverter {len(entries) + 1}",
+                            "port": bus.port,
+                            "address": address,
+                            "update_interval": args.interval,
+                        },
+                    )
+                    entry.add_to_hass(hass)
+                    entries.append(entry)
+
+            assert await async_setup_component(hass, DOMAIN, {DOMAIN: {"schedule_phase": args.phase}})
+            await hass.async_block_till_done()
+            coordinators = [hass.data[DOMAIN][entry.entry_id] for entry in entries]
+
+            soak = Soak(hass, clock, buses, coordinators, args)
+            real_start = time.perf_counter()
+            await soak.run()
+            print(soak.report(time.perf_counter() - real_start))
+            await hass.async_stop(force=True)
+    finally:
+        for bus in buses:
+            bus.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--inverters", type=int, default=40)
+    parser.add_argument("--buses", type=int, default=4)
+    parser.add_argument("--interval", type=int, default=5, help="poll interval in simulated seconds")
+    parser.add_argument("--phase", choices=["stagger", "align"], default="stagger")
+    parser.add_argument("--speed", type=float, default=60, help="simulated seconds per real second")
+    parser.add_argument("--hours", type=float, default=24, help="simulated duration")
+    parser.add_argument("--start-hour", type=float, default=4, help="simulated UTC hour of day to start at")
+    parser.add_argument("--fault-every", type=float, default=1800, help="simulated seconds between bus faults, 0 disables")
+    parser.add_argument("--fault-duration", type=float, default=60, help="simulated seconds a bus stays silent")
+    parser.add_argument("--alarm-rate", type=float, default=0.001, help="chance of a short alarm per sample")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    midnight = time.time() // 86400 * 86400
+    clock = AcceleratedClock(args.speed, midnight + args.start_hour * 3600)
+    clock.install()
+    loop = asyncio.SelectorEventLoop(ScaledSelector(selectors.DefaultSelector(), args.speed))
+    try:
+        loop.run_until_complete(async_main(args, clock))
+    finally:
+        loop.close()
+        clock.uninstall()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())